@@ -6,6 +6,9 @@ interface VehicleSelectProps {
   onVehicleSelect: (vehicle: { year: string; make: string; model: string }) => void;
 }
 
+// Base URL of the files written by generate_vehicle_options.py (vehicle_options_dist/)
+const VEHICLE_OPTIONS_URL = process.env.NEXT_PUBLIC_VEHICLE_OPTIONS_URL ?? '/vehicle-options';
+
 interface VehicleData {
   year: string;
   make: string;
@@ -24,14 +27,32 @@ const VehicleSelect: React.FC<VehicleSelectProps> = ({ onVehicleSelect }) => {
     model: ''
   });
 
-  // Fetch available years (from current year back to 1995)
+  // Per-year and per-make files produced by generate_vehicle_options.py,
+  // served from the CDN. Hashed file names can be cached forever; only the
+  // manifest needs a short cache lifetime.
+  const [manifest, setManifest] = useState<Record<string, string>>({});
+  const [yearIndex, setYearIndex] = useState<Record<string, string>>({});
+
+  const fetchArtifact = async (path: string) => {
+    const response = await fetch(`${VEHICLE_OPTIONS_URL}/${path}`);
+    if (!response.ok) {
+      throw new Error(`Failed to load ${path}: ${response.status}`);
+    }
+    return response.json();
+  };
+
+  // Fetch available years from the manifest
   useEffect(() => {
-    const currentYear = new Date().getFullYear();
-    const yearsList = Array.from(
-      { length: currentYear - 1995 + 1 },
-      (_, i) => (currentYear - i).toString()
-    );
-    setYears(yearsList);
+    fetchArtifact('manifest.json')
+      .then((data) => {
+        setManifest(data.years);
+        // Integer-like keys come back ascending; show the newest year first
+        setYears(Object.keys(data.years).sort((a, b) => Number(b) - Number(a)));
+      })
+      .catch((err) => {
+        setError("Failed to load vehicle years");
+        console.error("Error fetching manifest:", err);
+      });
   }, []);
 
   // Fetch makes for selected year
@@ -39,47 +60,16 @@ const VehicleSelect: React.FC<VehicleSelectProps> = ({ onVehicleSelect }) => {
     setLoading(true);
     setError(null);
     try {
-      // Fetch passenger cars, MPVs/SUVs, and light trucks
-      const [carsResponse, mpvResponse, trucksResponse] = await Promise.all([
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForVehicleType/passenger car?year=${year}&format=json`),
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForVehicleType/multipurpose passenger vehicle (mpv)?year=${year}&format=json`),
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForVehicleType/truck?year=${year}&format=json`)
-      ]);
-
-      const [carsData, mpvData, trucksData] = await Promise.all([
-        carsResponse.json(),
-        mpvResponse.json(),
-        trucksResponse.json()
-      ]);
-
-      console.log('Cars data:', carsData);
-      console.log('MPV data:', mpvData);
-      console.log('Trucks data:', trucksData);
-
-      // List of allowed consumer vehicle manufacturers
-      const allowedMakes = new Set([
-        'ACURA', 'ALFA ROMEO', 'ASTON MARTIN', 'AUDI', 'BENTLEY', 'BMW',
-        'BUICK', 'CADILLAC', 'CHEVROLET', 'CHRYSLER', 'DODGE', 'FERRARI', 'FIAT',
-        'FORD', 'GENESIS', 'GMC', 'HONDA', 'HYUNDAI', 'INFINITI', 'JAGUAR', 'JEEP',
-        'KIA', 'LAMBORGHINI', 'LAND ROVER', 'LEXUS', 'LINCOLN', 'LOTUS', 'MASERATI',
-        'MAZDA', 'MERCEDES-BENZ', 'MINI', 'MITSUBISHI', 'NISSAN',
-        'PORSCHE', 'RAM', 'ROLLS-ROYCE', 'SUBARU', 'TESLA', 'TOYOTA', 'VOLKSWAGEN', 'VOLVO'
-      ]);
-
-      // Combine results from all endpoints and filter
-      const allMakes = [...carsData.Results, ...mpvData.Results, ...trucksData.Results]
-        .map((make: any) => make.MakeName as string)
-        .filter((make: string) => allowedMakes.has(make.toUpperCase()));
+      const data = await fetchArtifact(manifest[year]);
+      const yearMakes = Object.keys(data.makes).sort();
 
-      // Remove duplicates and sort
-      const uniqueMakes = [...new Set(allMakes)].sort() as string[];
-
-      if (uniqueMakes.length === 0) {
+      if (yearMakes.length === 0) {
         setError("No vehicle makes found for the selected year");
         setMakes([]);
       } else {
-        setMakes(uniqueMakes);
+        setMakes(yearMakes);
       }
+      setYearIndex(data.makes);
       setModels([]);
       setSelectedData(prev => ({ ...prev, year, make: '', model: '' }));
     } catch (err) {
@@ -90,87 +80,15 @@ const VehicleSelect: React.FC<VehicleSelectProps> = ({ onVehicleSelect }) => {
     }
   };
 
-  // Fetch models for selected make and year
+  // Fetch models for selected make and year; filtering and "Other" are done by the generator
   const fetchModels = async (year: string, make: string) => {
     setLoading(true);
     setError(null);
     try {
-      // Fetch passenger cars, MPVs/SUVs, and light trucks
-      const [carsResponse, mpvResponse, trucksResponse] = await Promise.all([
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/make/${make}/modelyear/${year}/vehicletype/passenger car?format=json`),
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/make/${make}/modelyear/${year}/vehicletype/multipurpose passenger vehicle (mpv)?format=json`),
-        fetch(`https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/make/${make}/modelyear/${year}/vehicletype/truck?format=json`)
-      ]);
-
-      const [carsData, mpvData, trucksData] = await Promise.all([
-        carsResponse.json(),
-        mpvResponse.json(),
-        trucksResponse.json()
-      ]);
-
-      console.log('Cars models:', carsData);
-      console.log('MPV models:', mpvData);
-      console.log('Truck models:', trucksData);
-      
-      // Filter out unwanted vehicle types and models
-      const excludedKeywords = [
-        'CHASSIS', 'CAB', 'COMMERCIAL', 'MEDIUM DUTY', 'HEAVY DUTY',
-        'STRIPPED', 'INCOMPLETE', 'MOTORHOME', 'RV', 'BUS', 'TRACTOR',
-        'MOTORCYCLE', 'SCOOTER', 'ATV', 'TRAILER', 'VAN CAMPER', 'MOTOR COACH',
-        // Volvo specific exclusions
-        'FH', 'FM', 'FMX', 'NH', 'VHD', 'VNL', 'VNM', 'VNR', 'VNX', 'VT'
-      ];
-
-      // List of allowed model patterns (for models that start with letters followed by numbers)
-      const allowedModelPatterns = [
-        /^[A-Z]\d{1,2}$/,  // Matches Q50, G35, etc.
-        /^[A-Z][A-Z]\d{1,2}$/,  // Matches QX50, GX460, etc.
-        /^[A-Z]\d{3}[a-zA-Z]*$/,  // Matches M340i, S560e, etc.
-      ];
-
-      // Special cases for specific makes
-      const specialCases: Record<string, string[]> = {
-        'MERCEDES-BENZ': ['SPRINTER'],
-        // Add other special cases here if needed
-      };
-      
-      // Combine and filter models from all endpoints
-      const allModels = [...carsData.Results, ...mpvData.Results, ...trucksData.Results]
-        .map((model: any) => model.Model_Name as string)
-        .filter((model: string) => {
-          const upperModel = model.toUpperCase();
-          
-          // Check if it's a special case for the current make
-          if (specialCases[make] && specialCases[make].includes(upperModel)) {
-            return true;
-          }
-
-          // For Volvo, exclude models that contain only letters
-          if (make.toUpperCase() === 'VOLVO' && /^[A-Z]+$/.test(upperModel)) {
-            return false;
-          }
-          
-          // Check if model matches any of our allowed patterns
-          const isAllowedPattern = allowedModelPatterns.some(pattern => pattern.test(model));
-          
-          return (
-            // Allow models that match our patterns
-            isAllowedPattern ||
-            // Or models that don't contain excluded keywords and don't match unwanted patterns
-            (!excludedKeywords.some(keyword => upperModel.includes(keyword)) &&
-             !/^[A-Z]\d{4,}/.test(model) && // Excludes models with very long numbers
-             model.trim().length > 0) // Excludes empty model names
-          );
-        });
-
-      // Remove duplicates, sort, and add "Other" option
-      const filteredModels = [...new Set(allModels)].sort() as string[];
-      filteredModels.push('Other');
-
-      if (filteredModels.length === 1 && filteredModels[0] === 'Other') {
-        setError("No specific models found for the selected make and year");
-      }
-      setModels(filteredModels);
+      const data = await fetchArtifact(yearIndex[make]);
+      const models = data.models as string[];
+      // The generator sorts "Other" in with the models; list it last
+      setModels([...models.filter(model => model !== 'Other'), ...(models.includes('Other') ? ['Other'] : [])]);
       setSelectedData(prev => ({ ...prev, make, model: '' }));
     } catch (err) {
       setError("Failed to load vehicle models");
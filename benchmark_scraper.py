@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import pytesseract
+
+from concurrency_controller import AdaptiveConcurrencyController
+from mock_coverage_site import MockCoverageSite, build_catalog
+from navigation_strategies import resolve
+from rate_limiter import RateLimiter
+from scrape_tasks import ADAS_KEYS
+from scraper_models_years import ModelYearScraper
+
+logger = logging.getLogger(__name__)
+
+def systems_for_manufacturer(system_mappings, manufacturer):
+    """Pick the system names the mock should offer for a manufacturer."""
+    for key, mappings in system_mappings.items():
+        if key.upper() in manufacturer.upper() or manufacturer.upper() in key.upper():
+            systems = []
+            for options in mappings.values():
+                systems.extend(option for option in options if option != "N/A" and option not in systems)
+            return systems
+    return []
+
+
+def count_scraped_ymms(results_dir):
+    """Count YMM entries with complete ADAS data in the per-manufacturer shards."""
+    count = 0
+    for filename in os.listdir(results_dir):
+        if not filename.endswith("_results.json") or filename == "all_results.json":
+            continue
+        with open(os.path.join(results_dir, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for manufacturer_data in data.values():
+            for model_data in manufacturer_data.get("models", {}).values():
+                for value in model_data.values():
+                    if isinstance(value, dict) and all(key in value for key in ADAS_KEYS):
+                        count += 1
+    return count
+
+
+def resource_snapshot():
+    """CPU seconds and peak RSS (MB) for this process and its reaped children."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "cpu_self": own.ru_utime + own.ru_stime,
+        "cpu_children": children.ru_utime + children.ru_stime,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_self_mb": own.ru_maxrss / 1024,
+        "peak_rss_children_mb": children.ru_maxrss / 1024,
+    }
+
+
+def tesseract_available():
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    return bool(shutil.which(cmd) or os.path.isfile(cmd))
+
+
+async def run_benchmark(manufacturers, models_per_make, years_per_model, latency, jitter,
+                        max_workers=1, keep_workdir=False):
+    """Run ModelYearScraper against the mock site and return throughput figures.
+
+    The mock host is not rate limited, so the figures measure the scraper
+    rather than the production request budget. OCR runs only if tesseract
+    is installed; otherwise it is skipped and CSC codes are not read.
+    """
+    ocr_enabled = tesseract_available()
+    if not ocr_enabled:
+        logger.warning(f"tesseract not found at {pytesseract.pytesseract.tesseract_cmd!r}; "
+                       f"skipping OCR, so CSC codes are not read (use --tesseract-cmd)")
+
+    with open("system_mappings.json", "r", encoding="utf-8") as f:
+        system_mappings = json.load(f)
+
+    website_makes = {m: ModelYearScraper.MAKE_MAPPINGS[m] for m in manufacturers}
+    catalog = build_catalog(
+        list(website_makes.values()),
+        models_per_make=models_per_make,
+        years_per_model=years_per_model,
+        systems={website: systems_for_manufacturer(system_mappings, m) for m, website in website_makes.items()},
+        engine_config_makes=[website_makes[m] for m in manufacturers if resolve(m).vehicle_config],
+        year_menu_makes=[website_makes[m] for m in manufacturers if resolve(m).open_year_menu],
+    )
+
+    original_dir = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="scraper_bench_")
+    shutil.copy("system_mappings.json", workdir)
+    os.makedirs(os.path.join(workdir, "debug_info"), exist_ok=True)
+
+    try:
+        with MockCoverageSite(catalog, latency=latency, jitter=jitter) as site:
+            os.chdir(workdir)
+            scraper = ModelYearScraper(
+                coverage_url=site.url, headless=True,
+                concurrency=AdaptiveConcurrencyController(min_workers=1, max_workers=max_workers),
+                rate_limiter=RateLimiter(host_rates={**ModelYearScraper.HOST_RATE_LIMITS, site.host: None}),
+                ocr_enabled=ocr_enabled
+            )
+            scraper.MANUFACTURERS = list(manufacturers)
+
+            before = resource_snapshot()
+            start_time = time.perf_counter()
+            await scraper.run()
+            elapsed = time.perf_counter() - start_time
+            after = resource_snapshot()
+
+            ymms = count_scraped_ymms(scraper.results_dir)
+            requests_served = site.request_count
+            panel_cache_hit_rate = scraper.panel_cache.hit_rate
+    finally:
+        os.chdir(original_dir)
+        if keep_workdir:
+            logger.info(f"Benchmark working directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "manufacturers": list(manufacturers),
+        "models_per_make": models_per_make,
+        "years_per_model": years_per_model,
+        "latency_s": latency,
+        "max_workers": max_workers,
+        "ocr_enabled": ocr_enabled,
+        "catalog_ymms": len(manufacturers) * models_per_make * years_per_model,
+        "scraped_ymms": ymms,
+        "elapsed_s": round(elapsed, 2),
+        "ymm_per_min": round(ymms / elapsed * 60, 2) if elapsed else 0.0,
+        "cpu_self_s": round(after["cpu_self"] - before["cpu_self"], 2),
+        "cpu_browser_s": round(after["cpu_children"] - before["cpu_children"], 2),
+        "peak_rss_self_mb": round(after["peak_rss_self_mb"], 1),
+        "peak_rss_browser_mb": round(after["peak_rss_children_mb"], 1),
+        "requests_served": requests_served,
+        "panel_cache_hit_rate": round(panel_cache_hit_rate, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ModelYearScraper against a local mock coverage site")
+    parser.add_argument('--makes', nargs='+', default=['HONDA', 'MAZDA', 'SUBARU', 'TOYOTA'],
+                        help="Database manufacturer names to include in the mock catalog")
+    parser.add_argument('--models', type=int, default=3, help="Models per make")
+    parser.add_argument('--years', type=int, default=3, help="Years per model")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every mock request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument('--max-workers', type=int, default=1, help="Highest number of concurrent page workers")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    parser.add_argument('--keep-workdir', action='store_true', help="Keep the temporary results directory")
+    parser.add_argument('--tesseract-cmd', help="Path to the tesseract binary; OCR is skipped if none is found")
+    args = parser.parse_args()
+
+    if args.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+
+    unknown = [m for m in args.makes if m not in ModelYearScraper.MAKE_MAPPINGS]
+    if unknown:
+        parser.error(f"Unsupported manufacturers: {', '.join(unknown)}")
+
+    report = asyncio.run(run_benchmark(args.makes, args.models, args.years,
+                                       args.latency, args.jitter, args.max_workers, args.keep_workdir))
+
+    logger.info("Benchmark results:")
+    for key, value in report.items():
+        logger.info(f"  {key}: {value}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report saved to {args.output}")
+
+    # A run that scraped nothing (e.g. the browser failed to launch) is not a measurement
+    if not report["scraped_ymms"]:
+        logger.error("Benchmark scraped no YMMs")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
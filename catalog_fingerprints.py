@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(items):
+    """Order-independent hash of a menu's entries."""
+    digest = hashlib.sha1("\n".join(sorted(items)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def make_menu_key(manufacturer):
+    return f"make:{manufacturer}"
+
+
+def model_menu_key(manufacturer, model):
+    return f"model:{manufacturer}|{model}"
+
+
+def ymm_menu_key(manufacturer, model, year_or_chassis):
+    return f"ymm:{manufacturer}|{model}|{year_or_chassis}"
+
+
+class FingerprintStore:
+    """Menu fingerprints from this run compared against the previous run.
+
+    Three kinds of menus are tracked: each make's model list, each model's
+    year/chassis list and each YMM's system list. `update` records the
+    current entries and reports whether they differ from last time; every
+    difference is collected for the changelog.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = self._load()
+        self.current = {}
+        self.changes = []
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading menu fingerprints from {self.path}: {e}")
+            return {}
+
+    def update(self, key, items):
+        """Record a menu's entries; return True if it is new or changed since the last run."""
+        items = sorted(set(items))
+        entry = {"fingerprint": fingerprint(items), "items": items}
+        self.current[key] = entry
+
+        previous = self.previous.get(key)
+        if previous is None:
+            self.changes.append({"key": key, "change": "added", "items": items})
+            return True
+
+        if previous["fingerprint"] == entry["fingerprint"]:
+            return False
+
+        old_items = set(previous.get("items", []))
+        self.changes.append({
+            "key": key,
+            "change": "changed",
+            "added": sorted(set(items) - old_items),
+            "removed": sorted(old_items - set(items)),
+        })
+        logger.info(f"Menu changed for {key}")
+        return True
+
+    def seen_before(self, key):
+        """True if the previous run recorded this menu."""
+        return key in self.previous
+
+    def is_known(self, key):
+        return key in self.previous or key in self.current
+
+    def save(self):
+        """Persist fingerprints, keeping entries for subtrees not visited this run."""
+        merged = dict(self.previous)
+        merged.update(self.current)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def write_changelog(self, directory):
+        """Write the differences found this run; return the file name or None."""
+        if not self.changes:
+            logger.info("No menu changes since the previous run")
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, f"menu_changes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.changes, f, indent=2)
+        logger.info(f"Wrote {len(self.changes)} menu changes to {filename}")
+        return filename
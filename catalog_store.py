@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def now_iso():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class CatalogStore:
+    """The coverage site's menu tree: make -> model -> year/chassis -> system names.
+
+    Filled by the catalog phase, which only walks the menus, and read by the
+    calibrate phase as its work list. Every node carries the time it was
+    last seen so stale parts of the tree are easy to spot. Nodes whose menu
+    changed also carry `changed_at`, so the calibrate phase can revisit
+    them even though the catalog phase has already updated the fingerprint.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Error reading catalog from {self.path}: {e}")
+        return {"updated_at": None, "makes": {}}
+
+    @property
+    def makes(self):
+        return self.data["makes"]
+
+    def set_models(self, manufacturer, website_make, models):
+        """Record a make's model list, keeping what is known about models still offered."""
+        old_models = self.makes.get(manufacturer, {}).get("models", {})
+        self.makes[manufacturer] = {
+            "website_make": website_make,
+            "seen_at": now_iso(),
+            "models": {model: old_models.get(model, {"years": {}}) for model in models},
+        }
+
+    def set_years(self, manufacturer, model, years_or_chassis, changed=False):
+        model_entry = self._model(manufacturer, model)
+        old_years = model_entry.get("years", {})
+        model_entry["seen_at"] = now_iso()
+        if changed:
+            model_entry["changed_at"] = now_iso()
+        model_entry["years"] = {year: old_years.get(year, {}) for year in years_or_chassis}
+
+    def set_systems(self, manufacturer, model, year_or_chassis, systems, changed=False):
+        years = self._model(manufacturer, model).setdefault("years", {})
+        entry = {"seen_at": now_iso(), "systems": list(systems)}
+        changed_at = now_iso() if changed else years.get(year_or_chassis, {}).get("changed_at")
+        if changed_at:
+            entry["changed_at"] = changed_at
+        years[year_or_chassis] = entry
+
+    def changed_at(self, manufacturer, model, year_or_chassis=None):
+        """When the catalog last saw a model's year list, or a YMM's system menu, change; or None."""
+        model_entry = self.makes.get(manufacturer, {}).get("models", {}).get(model, {})
+        if year_or_chassis is None:
+            return model_entry.get("changed_at")
+        return model_entry.get("years", {}).get(year_or_chassis, {}).get("changed_at")
+
+    def _model(self, manufacturer, model):
+        make_entry = self.makes.setdefault(manufacturer, {"models": {}})
+        return make_entry["models"].setdefault(model, {"years": {}})
+
+    def website_make(self, manufacturer):
+        return self.makes.get(manufacturer, {}).get("website_make")
+
+    def models(self, manufacturer):
+        """Model -> list of years/chassis for a make."""
+        models = self.makes.get(manufacturer, {}).get("models", {})
+        return {model: list(entry.get("years", {})) for model, entry in models.items()}
+
+    def ymm_count(self, manufacturer):
+        return sum(len(years) for years in self.models(manufacturer).values())
+
+    def save(self):
+        self.data["updated_at"] = now_iso()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved catalog of {len(self.makes)} makes to {self.path}")
+
+
+def assign_shard(manufacturers, sizes, shard_index, shard_count):
+    """Return the manufacturers belonging to one shard.
+
+    Whole manufacturers are assigned so two shards never write the same
+    results file. Makes are handed out largest first to the shard with
+    the least work, so every process computes the same split from the
+    same catalog.
+    """
+    loads = [0] * shard_count
+    assigned = [[] for _ in range(shard_count)]
+    for manufacturer in sorted(manufacturers, key=lambda m: (-sizes.get(m, 0), m)):
+        target = loads.index(min(loads))
+        assigned[target].append(manufacturer)
+        loads[target] += sizes.get(manufacturer, 0)
+    return [m for m in manufacturers if m in assigned[shard_index]]
+
+
+def parse_shard(value):
+    """Parse `i/n` (1-based) into a zero-based index and a count."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like 1/4, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {value!r}")
+    return index - 1, count
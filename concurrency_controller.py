@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import math
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyController:
+    """AIMD controller for the number of page workers allowed to run at once.
+
+    Every `window` task outcomes the controller looks at page-load times,
+    timeouts and errors. If the site looks healthy the limit grows by
+    `increase_step`; if loads are slow, timeouts pile up or errors exceed
+    `max_error_rate` the limit is multiplied by `decrease_factor`. The
+    limit always stays within [min_workers, max_workers].
+    """
+
+    def __init__(self, min_workers=1, max_workers=4, initial_workers=None, window=8,
+                 target_load_time=5.0, max_timeout_rate=0.1, max_error_rate=0.2,
+                 increase_step=1, decrease_factor=0.5):
+        self.min_workers = min_workers
+        self.max_workers = max(min_workers, max_workers)
+        self.limit = min(self.max_workers, max(min_workers, initial_workers or min_workers))
+        self.window = window
+        self.target_load_time = target_load_time
+        self.max_timeout_rate = max_timeout_rate
+        self.max_error_rate = max_error_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.active = 0
+        self.decisions = []
+        self._load_times = []
+        self._outcomes = []
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the currently allowed worker slots."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.active -= 1
+                self._condition.notify_all()
+
+    def record_load_time(self, seconds):
+        """Record how long a coverage page took to load."""
+        self._load_times.append(seconds)
+
+    async def record_result(self, error=False, timed_out=False):
+        """Record a task attempt outcome and adjust the limit once a window is full."""
+        self._outcomes.append((error, timed_out))
+        if len(self._outcomes) < self.window:
+            return
+
+        async with self._condition:
+            self._adjust()
+            self._condition.notify_all()
+
+    def _adjust(self):
+        outcomes, self._outcomes = self._outcomes, []
+        load_times, self._load_times = self._load_times, []
+
+        error_rate = sum(1 for error, _ in outcomes if error) / len(outcomes)
+        timeout_rate = sum(1 for _, timed_out in outcomes if timed_out) / len(outcomes)
+        load_p90 = None
+        if load_times:
+            ordered = sorted(load_times)
+            load_p90 = ordered[min(len(ordered) - 1, math.ceil(0.9 * len(ordered)) - 1)]
+
+        if timeout_rate > self.max_timeout_rate:
+            reason = f"timeout rate {timeout_rate:.0%} above {self.max_timeout_rate:.0%}"
+        elif error_rate > self.max_error_rate:
+            reason = f"error rate {error_rate:.0%} above {self.max_error_rate:.0%}"
+        elif load_p90 is not None and load_p90 > self.target_load_time:
+            reason = f"p90 page load {load_p90:.1f}s above {self.target_load_time:.1f}s"
+        else:
+            reason = None
+
+        old_limit = self.limit
+        if reason:
+            self.limit = max(self.min_workers, math.floor(self.limit * self.decrease_factor))
+            action = "decrease" if self.limit < old_limit else "hold"
+        else:
+            self.limit = min(self.max_workers, self.limit + self.increase_step)
+            action = "increase" if self.limit > old_limit else "hold"
+            reason = "site healthy"
+
+        load_text = f"{load_p90:.1f}s" if load_p90 is not None else "n/a"
+        self.decisions.append({
+            "action": action,
+            "from": old_limit,
+            "to": self.limit,
+            "reason": reason,
+            "error_rate": error_rate,
+            "timeout_rate": timeout_rate,
+            "load_p90": load_p90,
+        })
+        logger.info(f"Concurrency {action} {old_limit} -> {self.limit}: {reason} "
+                    f"(errors {error_rate:.0%}, timeouts {timeout_rate:.0%}, p90 load {load_text})")
@@ -1,9 +1,22 @@
+import argparse
 import asyncio
 import aiohttp
+import hashlib
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 import re
 import logging
+import os
+import sys
+
+from model_filters import DEFAULT_RULES_PATH, ModelFilter
+from rate_limiter import RateLimiter
+from vehicle_options_artifacts import DEFAULT_ARTIFACTS_DIR, ArtifactWriter
+from vehicle_search_index import DEFAULT_INDEX_FILE, SearchIndex
+from retry_policy import RetryPolicy
+from vpic_cache import ResponseCache
+from vpic_local import LocalVpicStore
 
 # Configure logging
 logging.basicConfig(
@@ -12,84 +25,183 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Constants from VehicleSelect.tsx
-ALLOWED_MAKES = {
-    'ACURA', 'ALFA ROMEO', 'ASTON MARTIN', 'AUDI', 'BENTLEY', 'BMW',
-    'BUICK', 'CADILLAC', 'CHEVROLET', 'CHRYSLER', 'DODGE', 'FERRARI', 'FIAT',
-    'FORD', 'GENESIS', 'GMC', 'HONDA', 'HYUNDAI', 'INFINITI', 'JAGUAR', 'JEEP',
-    'KIA', 'LAMBORGHINI', 'LAND ROVER', 'LEXUS', 'LINCOLN', 'LOTUS', 'MASERATI',
-    'MAZDA', 'MERCEDES-BENZ', 'MINI', 'MITSUBISHI', 'NISSAN',
-    'PORSCHE', 'RAM', 'ROLLS-ROYCE', 'SUBARU', 'TESLA', 'TOYOTA', 'VOLKSWAGEN', 'VOLVO'
-}
-
-EXCLUDED_KEYWORDS = [
-    'CHASSIS', 'CAB', 'COMMERCIAL', 'MEDIUM DUTY', 'HEAVY DUTY',
-    'STRIPPED', 'INCOMPLETE', 'MOTORHOME', 'RV', 'BUS', 'TRACTOR',
-    'MOTORCYCLE', 'SCOOTER', 'ATV', 'TRAILER', 'VAN CAMPER', 'MOTOR COACH',
-    # Volvo specific exclusions
-    'FH', 'FM', 'FMX', 'NH', 'VHD', 'VNL', 'VNM', 'VNR', 'VNX', 'VT'
-]
-
-# Allowed model patterns (for models that start with letters followed by numbers)
-ALLOWED_MODEL_PATTERNS = [
-    r'^[A-Z]\d{1,2}$',  # Matches Q50, G35, etc.
-    r'^[A-Z][A-Z]\d{1,2}$',  # Matches QX50, GX460, etc.
-    r'^[A-Z]\d{3}[a-zA-Z]*$',  # Matches M340i, S560e, etc.
-]
-
-# Special cases for specific makes
-SPECIAL_CASES = {
-    'MERCEDES-BENZ': ['SPRINTER'],
-}
+# Make and model rules for vehicle_options.json, see model_filter_rules.json
+MODEL_FILTER = ModelFilter.load("vpic")
+ALLOWED_MAKES = MODEL_FILTER.allowed_makes
+
+OUTPUT_FILE = 'vehicle_options.json'
+CHECKPOINT_FILE = 'vehicle_options.partial.json'
+# An interrupted run older than this is fetched again rather than resumed
+CHECKPOINT_MAX_AGE = timedelta(days=7)
+
+VEHICLE_TYPES = ['passenger car', 'multipurpose passenger vehicle (mpv)', 'truck']
+
+VPIC_API = 'https://vpic.nhtsa.dot.gov/api/vehicles'
+FAILED_URLS_FILE = 'vehicle_options.failed_urls.json'
+
+# Statuses worth retrying; anything else is a permanent failure for that URL
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableHTTPError(Exception):
+    """A throttled or failed response that may succeed if tried again later."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
 
 class VehicleOptionsGenerator:
-    def __init__(self):
+    """Builds year -> make -> models from the vPIC API.
+
+    By default queries are planned to need fewer calls than the naive
+    make x year x vehicle type sweep:
+    - GetMakesForVehicleType ignores its year parameter, so the three make
+      lists are fetched once per run instead of once per year.
+    - Each make's Model_IDs per vehicle type are fetched once across all
+      years; each make-year then needs a single untyped query, filtered
+      locally to those Model_IDs.
+    This assumes a model keeps its vehicle type across years. Pass
+    `legacy_queries=True` for the original per-year, per-type queries.
+    """
+
+    def __init__(self, max_concurrency=10, pool_size=20, per_host_limit=10, cache=None, legacy_queries=False,
+                 checkpoint_path=None, year_concurrency=4, rate_limit=5.0, retry_policy=None):
         self.results = {}
+        # Years finished by this or an interrupted earlier run, written after each one
+        self.checkpoint_path = checkpoint_path
+        self.completed_years = {}
+        # Only a few years at a time, so years finish (and are checkpointed) steadily
+        self.year_semaphore = asyncio.Semaphore(year_concurrency)
+        self.cache = cache
+        self.legacy_queries = legacy_queries
+        # Shared lookups, fetched once and awaited by every year that needs them
+        self._shared = {}
         self.current_year = datetime.now().year
         self.start_year = 1995
+        # Requests in flight at once, and the connection pool behind them
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        # Requests per second to the vPIC host, and retries for transient failures
+        self.rate_limiter = RateLimiter(default_rate=rate_limit)
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=60.0)
+        # URLs that still failed after retrying; the years they feed are fetched again at the end
+        self.failed_urls = set()
+        self.incomplete_years = {}
 
     async def fetch_data(self, session, url):
-        try:
-            async with session.get(url) as response:
-                return await response.json()
-        except Exception as e:
-            logger.error(f"Error fetching data from {url}: {e}")
-            return None
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached is not None or self.cache.offline:
+                return cached
+
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            try:
+                async with self.semaphore:
+                    return await self.request(session, url)
+            except (RetryableHTTPError, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                permanent = isinstance(e, aiohttp.ClientResponseError) or isinstance(e, ValueError)
+                if permanent or attempt == self.retry_policy.max_attempts:
+                    logger.error(f"Error fetching data from {url}: {e}")
+                    break
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is not None:
+                    # Honour the server, but never wait longer than our own longest backoff
+                    delay = min(max(0.0, retry_after), self.retry_policy.max_delay)
+                else:
+                    delay = self.retry_policy.backoff(attempt)
+                logger.warning(f"Fetching {url} failed ({e}), retry {attempt}/{self.retry_policy.max_attempts - 1} "
+                               f"in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        # Stale data beats none when the API is unreachable
+        stale = self.cache.get_stale(url) if self.cache else None
+        if stale is None:
+            self.failed_urls.add(url)
+        return stale
+
+    async def request(self, session, url):
+        """Make one rate-limited request and return its JSON, raising on failure."""
+        await self.rate_limiter.acquire(url)
+        headers = self.cache.validators(url) if self.cache else {}
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and self.cache:
+                return self.cache.revalidated(url)
+            if response.status in RETRYABLE_STATUSES:
+                raise RetryableHTTPError(response.status, parse_retry_after(response.headers.get('Retry-After')))
+            response.raise_for_status()
+            data = await response.json()
+            if self.cache:
+                self.cache.store(url, data, response.headers)
+            return data
 
     def is_valid_model(self, model: str, make: str) -> bool:
-        upper_model = model.upper()
-        
-        # Check special cases
-        if make in SPECIAL_CASES and upper_model in SPECIAL_CASES[make]:
-            return True
-
-        # For Volvo, exclude models that contain only letters
-        if make.upper() == 'VOLVO' and re.match(r'^[A-Z]+$', upper_model):
-            return False
-
-        # Check if model matches any of our allowed patterns
-        is_allowed_pattern = any(re.match(pattern, model) for pattern in ALLOWED_MODEL_PATTERNS)
-
-        return (
-            is_allowed_pattern or
-            (not any(keyword in upper_model for keyword in EXCLUDED_KEYWORDS) and
-             not re.match(r'^[A-Z]\d{4,}', model) and
-             model.strip())
-        )
+        return MODEL_FILTER.is_valid(model, make)
+
+    def shared(self, key, factory):
+        """Start `factory()` once per key and hand every caller the same task."""
+        if key not in self._shared:
+            self._shared[key] = asyncio.ensure_future(factory())
+        return self._shared[key]
+
+    async def fetch_typed_model_ids(self, session, make: str):
+        """Model_IDs the make has under any of our vehicle types, or None if a query failed."""
+        urls = [
+            f'{VPIC_API}/GetModelsForMakeYear/make/{make}/vehicletype/{vehicle_type}?format=json'
+            for vehicle_type in VEHICLE_TYPES
+        ]
+        model_ids = set()
+        for data in await asyncio.gather(*(self.fetch_data(session, url) for url in urls)):
+            if not data or 'Results' not in data:
+                # The per-type fallback queries make up for these, so they aren't lost data
+                self.failed_urls.difference_update(urls)
+                return None
+            model_ids.update(model['Model_ID'] for model in data['Results'])
+        return model_ids
 
     async def fetch_models_for_make_year(self, session, make: str, year: str):
-        vehicle_types = ['passenger car', 'multipurpose passenger vehicle (mpv)', 'truck']
         models = set()
 
-        for vehicle_type in vehicle_types:
-            url = f'https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/make/{make}/modelyear/{year}/vehicletype/{vehicle_type}?format=json'
-            data = await self.fetch_data(session, url)
-            
+        model_ids = None
+        if not self.legacy_queries:
+            model_ids = await self.shared(('model_ids', make), lambda: self.fetch_typed_model_ids(session, make))
+            if model_ids is None:
+                logger.warning(f"Vehicle type lookup failed for {make}, using per-type queries for {year}")
+
+        if model_ids is not None:
+            url = f'{VPIC_API}/GetModelsForMakeYear/make/{make}/modelyear/{year}?format=json'
+            responses = [await self.fetch_data(session, url)]
+        else:
+            urls = [
+                f'{VPIC_API}/GetModelsForMakeYear/make/{make}/modelyear/{year}/vehicletype/{vehicle_type}?format=json'
+                for vehicle_type in VEHICLE_TYPES
+            ]
+            responses = await asyncio.gather(*(self.fetch_data(session, url) for url in urls))
+
+        for data in responses:
             if data and 'Results' in data:
                 valid_models = [
                     model['Model_Name']
                     for model in data['Results']
-                    if self.is_valid_model(model['Model_Name'], make)
+                    if (model_ids is None or model['Model_ID'] in model_ids) and
+                    self.is_valid_model(model['Model_Name'], make)
                 ]
                 models.update(valid_models)
 
@@ -100,13 +212,17 @@ class VehicleOptionsGenerator:
         return sorted(list(models))
 
     async def fetch_makes_for_year(self, session, year: str):
-        vehicle_types = ['passenger car', 'multipurpose passenger vehicle (mpv)', 'truck']
+        if self.legacy_queries:
+            return await self.fetch_makes(session, year)
+        # The make lists are the same for every year
+        return await self.shared('makes', lambda: self.fetch_makes(session))
+
+    async def fetch_makes(self, session, year: str = None):
         makes = set()
 
-        for vehicle_type in vehicle_types:
-            url = f'https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForVehicleType/{vehicle_type}?year={year}&format=json'
-            data = await self.fetch_data(session, url)
-            
+        query = f'year={year}&format=json' if year else 'format=json'
+        urls = [f'{VPIC_API}/GetMakesForVehicleType/{vehicle_type}?{query}' for vehicle_type in VEHICLE_TYPES]
+        for data in await asyncio.gather(*(self.fetch_data(session, url) for url in urls)):
             if data and 'Results' in data:
                 valid_makes = [
                     make['MakeName']
@@ -117,38 +233,323 @@ class VehicleOptionsGenerator:
 
         return sorted(list(makes))
 
-    async def generate_options(self):
-        async with aiohttp.ClientSession() as session:
-            for year in range(self.current_year, self.start_year - 1, -1):
-                year_str = str(year)
-                logger.info(f"Processing year {year_str}")
-                
-                makes = await self.fetch_makes_for_year(session, year_str)
-                if not makes:
-                    logger.warning(f"No makes found for year {year_str}")
-                    continue
-
-                self.results[year_str] = {}
-                
-                for make in makes:
-                    logger.info(f"Processing {year_str} {make}")
-                    models = await self.fetch_models_for_make_year(session, make, year_str)
-                    
-                    if models:
-                        self.results[year_str][make] = models
-                    else:
-                        logger.warning(f"No models found for {year_str} {make}")
-
-    def save_results(self):
-        output_file = 'vehicle_options.json'
-        with open(output_file, 'w') as f:
+    async def generate_year(self, session, year_str: str):
+        """Fetch every make and its models for one year; None if the year has no makes."""
+        logger.info(f"Processing year {year_str}")
+
+        makes = await self.fetch_makes_for_year(session, year_str)
+        if not makes:
+            logger.warning(f"No makes found for year {year_str}")
+            return None
+
+        all_models = await asyncio.gather(
+            *(self.fetch_models_for_make_year(session, make, year_str) for make in makes)
+        )
+
+        year_options = {}
+        for make, models in zip(makes, all_models):
+            if models:
+                year_options[make] = models
+            else:
+                logger.warning(f"No models found for {year_str} {make}")
+        return year_options
+
+    def load_existing(self, path=OUTPUT_FILE):
+        """Start from a previously generated file so only some years need fetching."""
+        if not os.path.exists(path):
+            logger.warning(f"No existing {path}, the requested years will be the whole file")
+            return
+        with open(path, 'r') as f:
+            self.results = json.load(f)
+        logger.info(f"Loaded {len(self.results)} years from {path}")
+
+    def years_to_generate(self, years=None):
+        if years is None:
+            years = range(self.current_year, self.start_year - 1, -1)
+        return [str(year) for year in sorted(years, reverse=True)]
+
+    async def generate_options(self, years=None):
+        """Fetch `years` (default: every year) and merge them into the results."""
+        years = self.years_to_generate(years)
+        self._shared = {}
+        self.load_checkpoint()
+        pending = [year for year in years if year not in self.completed_years]
+        if len(pending) < len(years):
+            logger.info(f"Resuming: {len(years) - len(pending)} years already done, {len(pending)} to fetch")
+
+        connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host_limit)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(self.generate_and_checkpoint(session, year) for year in pending))
+
+            # One targeted pass over the years that lost data to failed requests
+            retry_years = [year for year in pending if year not in self.completed_years]
+            if self.failed_urls and retry_years:
+                logger.info(f"Re-fetching {len(self.failed_urls)} failed URLs for {len(retry_years)} years")
+                self.failed_urls = set()
+                self._shared = {}
+                await asyncio.gather(*(self.generate_and_checkpoint(session, year) for year in retry_years))
+
+        self.save_failed_urls()
+        self.merge_years(years, [self.year_result(year) for year in years])
+
+    def year_result(self, year_str):
+        """The data to merge for a year: complete data, else partial data only if nothing better is on file."""
+        if year_str in self.completed_years:
+            return self.completed_years[year_str]
+        if year_str in self.incomplete_years:
+            if year_str in self.results:
+                logger.error(f"{year_str} is still incomplete after the re-fetch pass")
+                return None  # merge_years keeps the previous data
+            logger.error(f"{year_str} is incomplete after the re-fetch pass and has no previous data; "
+                         f"saving what was fetched")
+            return self.incomplete_years[year_str]
+        return None
+
+    def year_failed(self, year_str: str):
+        """True if a failed URL fed this year: one of its own queries or the shared make lists."""
+        for url in self.failed_urls:
+            match = re.search(r'(?:modelyear/|year=)(\d{4})', url)
+            if match:
+                if match.group(1) == year_str:
+                    return True
+            elif 'GetMakesForVehicleType' in url:
+                return True
+        return False
+
+    async def generate_and_checkpoint(self, session, year_str: str):
+        async with self.year_semaphore:
+            year_options = await self.generate_year(session, year_str)
+        if year_options is not None and self.year_failed(year_str):
+            # Keep what we have in case the re-fetch pass fails too, but don't call it done
+            self.incomplete_years[year_str] = year_options
+            return
+        # Years without makes are left for the next attempt
+        if year_options is not None:
+            self.completed_years[year_str] = year_options
+            self.incomplete_years.pop(year_str, None)
+            self.save_checkpoint()
+
+    def save_failed_urls(self):
+        """List URLs that failed even after the re-fetch pass, or remove an old list."""
+        if self.failed_urls:
+            with open(FAILED_URLS_FILE, 'w') as f:
+                json.dump(sorted(self.failed_urls), f, indent=2)
+            logger.error(f"{len(self.failed_urls)} vPIC requests failed, affected years may be incomplete; "
+                         f"see {FAILED_URLS_FILE}")
+        elif os.path.exists(FAILED_URLS_FILE):
+            os.remove(FAILED_URLS_FILE)
+
+    def checkpoint_params(self):
+        """The settings that shape a year's data; a checkpoint is only resumed by a run with the same ones."""
+        with open(DEFAULT_RULES_PATH, 'rb') as f:
+            filter_rules = hashlib.sha256(f.read()).hexdigest()
+        return {
+            "legacy_queries": self.legacy_queries,
+            "offline": bool(self.cache and self.cache.offline),
+            "vehicle_types": VEHICLE_TYPES,
+            "filter_rules": filter_rules,
+        }
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            if "years" not in checkpoint:
+                logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: it does not record its run settings")
+                return
+            if checkpoint.get("params") != self.checkpoint_params():
+                logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: it was written with different settings "
+                               f"({checkpoint.get('params')})")
+                return
+            age = datetime.now() - datetime.fromisoformat(checkpoint["saved_at"])
+            if age > CHECKPOINT_MAX_AGE:
+                logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: last saved {age.days} days ago")
+                return
+            self.completed_years.update(checkpoint["years"])
+            logger.info(f"Loaded {len(self.completed_years)} completed years from {self.checkpoint_path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        checkpoint = {
+            "params": self.checkpoint_params(),
+            "saved_at": datetime.now().isoformat(timespec='seconds'),
+            "years": self.completed_years,
+        }
+        tmp_file = f"{self.checkpoint_path}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        """Remove the checkpoint once the results are safely saved."""
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.completed_years = {}
+
+    def generate_from_store(self, store, years=None):
+        """Build the same options from a local vPIC store, without network calls."""
+        years = self.years_to_generate(years)
+        makes = sorted(make for make in store.makes(VEHICLE_TYPES) if make.upper() in ALLOWED_MAKES)
+
+        year_results = []
+        for year_str in years:
+            if not makes:
+                logger.warning(f"No makes found for year {year_str}")
+                year_results.append(None)
+                continue
+
+            year_options = {}
+            for make in makes:
+                models = {model for model in store.models(make, year_str, VEHICLE_TYPES)
+                          if self.is_valid_model(model, make)}
+                if models:
+                    models.add('Other')
+                    year_options[make] = sorted(models)
+                else:
+                    logger.warning(f"No models found for {year_str} {make}")
+            year_results.append(year_options)
+
+        self.merge_years(years, year_results)
+
+    def merge_years(self, years, year_results):
+        """Merge freshly generated years into the results, newest year first."""
+        for year_str, year_options in zip(years, year_results):
+            if year_options is not None:
+                self.results[year_str] = year_options
+            elif year_str in self.results:
+                logger.warning(f"Keeping previous data for {year_str}")
+
+        # Keep the newest-first year order of a full run
+        self.results = {year: self.results[year] for year in sorted(self.results, reverse=True)}
+
+    def save_results(self, output_file=OUTPUT_FILE):
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w') as f:
             json.dump(self.results, f, indent=2)
+        os.replace(tmp_file, output_file)
         logger.info(f"Results saved to {output_file}")
 
+    def save_artifacts(self, directory=DEFAULT_ARTIFACTS_DIR):
+        """Write the per-year and per-make files the frontend loads from the CDN."""
+        return ArtifactWriter(directory).write_options(self.results)
+
+    def save_search_index(self, path=DEFAULT_INDEX_FILE):
+        """Write the make/model typeahead index for every generated year."""
+        index = SearchIndex.build(self.results)
+        index.save(path)
+        return index
+
+
+def parse_years(spec):
+    """Parse a year list like "2024-2026" or "2019,2022-2024" into a set of years."""
+    years = set()
+    for part in spec.split(','):
+        start, _, end = part.strip().partition('-')
+        try:
+            first, last = int(start), int(end or start)
+        except ValueError:
+            raise ValueError(f"Invalid year range: {part!r}")
+        years.update(range(min(first, last), max(first, last) + 1))
+    return years
+
 async def main():
-    generator = VehicleOptionsGenerator()
-    await generator.generate_options()
+    parser = argparse.ArgumentParser(description="Generate vehicle_options.json from the NHTSA vPIC API")
+    parser.add_argument('--concurrency', type=int, default=10, help="Maximum vPIC requests in flight")
+    parser.add_argument('--pool-size', type=int, default=20, help="Total connections in the HTTP pool")
+    parser.add_argument('--per-host', type=int, default=10, help="Connections allowed to a single host")
+    parser.add_argument('--cache', default='vpic_cache.sqlite', help="SQLite file for cached vPIC responses")
+    parser.add_argument('--no-cache', action='store_true', help="Always fetch from the vPIC API")
+    parser.add_argument('--offline', action='store_true', help="Only use cached responses")
+    parser.add_argument('--stable-after', type=int, default=2,
+                        help="Cached responses for model years at least this many years old never expire")
+    parser.add_argument('--years', help="Only refresh these years, e.g. 2024-2026 or 2019,2022-2024")
+    parser.add_argument('--recent', type=int, help="Only refresh the most recent N model years")
+    parser.add_argument('--year-concurrency', type=int, default=4, help="Years fetched at the same time")
+    parser.add_argument('--rate-limit', type=float, default=5.0, help="Requests per second to the vPIC API")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore the checkpoint of an interrupted run and fetch every year again")
+    parser.add_argument('--legacy-queries', action='store_true',
+                        help="Query every make-year once per vehicle type instead of using the query planner")
+    parser.add_argument('--ingest', metavar='EXPORT', action='append', default=[],
+                        help="Load a vPIC export (.csv or SQLite) into the local store (repeatable)")
+    parser.add_argument('--ingest-table', default='models', help="Table to read from SQLite exports")
+    parser.add_argument('--local', action='store_true', help="Generate from the local store instead of the API")
+    parser.add_argument('--local-db', default='vpic_local.sqlite', help="SQLite file for the local vPIC store")
+    parser.add_argument('--artifacts-dir', default=DEFAULT_ARTIFACTS_DIR,
+                        help="Directory for the sharded, pre-compressed frontend files")
+    parser.add_argument('--no-artifacts', action='store_true', help="Only write vehicle_options.json")
+    parser.add_argument('--search-index', default=DEFAULT_INDEX_FILE, help="Where to write the typeahead index")
+    parser.add_argument('--no-search-index', action='store_true', help="Don't build the typeahead index")
+    args = parser.parse_args()
+    if args.no_cache and args.offline:
+        parser.error("--offline needs the cache")
+    if args.years and args.recent:
+        parser.error("Use either --years or --recent")
+
+    cache = None
+    if not (args.no_cache or args.local or args.ingest):
+        cache = ResponseCache(args.cache, stable_after_years=args.stable_after, offline=args.offline)
+
+    generator = VehicleOptionsGenerator(
+        max_concurrency=args.concurrency,
+        pool_size=args.pool_size,
+        per_host_limit=args.per_host,
+        cache=cache,
+        legacy_queries=args.legacy_queries,
+        checkpoint_path=CHECKPOINT_FILE,
+        year_concurrency=args.year_concurrency,
+        rate_limit=args.rate_limit
+    )
+    if args.restart:
+        generator.clear_checkpoint()
+
+    years = None
+    if args.years:
+        try:
+            years = parse_years(args.years)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.recent:
+        years = range(generator.current_year - args.recent + 1, generator.current_year + 1)
+
+    if args.ingest or args.local:
+        store = LocalVpicStore(args.local_db)
+        try:
+            for export in args.ingest:
+                store.ingest(export, args.ingest_table)
+            if args.local:
+                if years is not None:
+                    generator.load_existing()
+                generator.generate_from_store(store, years)
+                generator.save_results()
+                if not args.no_artifacts:
+                    generator.save_artifacts(args.artifacts_dir)
+                if not args.no_search_index:
+                    generator.save_search_index(args.search_index)
+        finally:
+            store.close()
+        return
+
+    if years is not None:
+        generator.load_existing()
+    await generator.generate_options(years)
     generator.save_results()
+    generator.clear_checkpoint()
+    if not args.no_artifacts:
+        generator.save_artifacts(args.artifacts_dir)
+    if not args.no_search_index:
+        generator.save_search_index(args.search_index)
+    if cache:
+        cache.log_stats()
+        cache.close()
+    if generator.incomplete_years:
+        logger.error(f"Incomplete years: {', '.join(sorted(generator.incomplete_years))}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
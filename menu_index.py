@@ -0,0 +1,105 @@
+"""In-page index of coverage menu items.
+
+`MENU_INDEX_SCRIPT` is installed on every page with `context.add_init_script`.
+It keeps `window.__menuIndex`, a map of menu level -> item text -> elements
+over the page's `li` and `td` items. A MutationObserver marks the index stale
+whenever the DOM changes, and the next query rebuilds it from those items
+only, so lookups never walk `querySelectorAll('*')` or compute styles for
+the whole document. Only the matching candidates are checked for visibility.
+
+Levels come from the `.levelN` class of the enclosing dropbox (2 = models,
+3 = years/chassis, ...); items outside any dropbox, such as table cells,
+are level 0. Passing level=None searches every level.
+"""
+
+MENU_INDEX_SCRIPT = """
+(() => {
+    if (window.__menuIndex) return;
+    let index = null;
+
+    const levelOf = (el) => {
+        const menu = el.closest('[class*="level"]');
+        const match = menu && /level(\\d+)/.exec(menu.className);
+        return match ? Number(match[1]) : 0;
+    };
+
+    const build = () => {
+        index = new Map();
+        for (const el of document.querySelectorAll('li, td')) {
+            const text = el.textContent.trim();
+            if (!text) continue;
+            const level = levelOf(el);
+            if (!index.has(level)) index.set(level, new Map());
+            const byText = index.get(level);
+            if (!byText.has(text)) byText.set(text, []);
+            byText.get(text).push(el);
+        }
+        return index;
+    };
+
+    const levels = (level) => {
+        const current = index || build();
+        if (level === null || level === undefined) return Array.from(current.values());
+        return current.has(level) ? [current.get(level)] : [];
+    };
+
+    const visible = (el) => el.isConnected && el.getClientRects().length > 0;
+
+    const matches = (text, level, visibleOnly) => {
+        const found = [];
+        for (const byText of levels(level)) {
+            for (const el of byText.get(text) || []) {
+                if (!visibleOnly || visible(el)) found.push(el);
+            }
+        }
+        return found;
+    };
+
+    const observe = () => new MutationObserver(() => { index = null; }).observe(
+        document.documentElement, {childList: true, subtree: true, characterData: true}
+    );
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe);
+
+    window.__menuIndex = {
+        find: (text, level = null, visibleOnly = true) => matches(text, level, visibleOnly).length,
+        click: (text, level = null, last = false) => {
+            const found = matches(text, level, true);
+            if (!found.length) return false;
+            found[last ? found.length - 1 : 0].click();
+            return true;
+        },
+        list: (level = null, pattern = null) => {
+            const regex = pattern ? new RegExp(pattern) : null;
+            const texts = [];
+            for (const byText of levels(level)) {
+                for (const [text, elements] of byText) {
+                    if ((!regex || regex.test(text)) && elements.some(visible)) texts.push(text);
+                }
+            }
+            return texts;
+        },
+    };
+})();
+"""
+
+# Years like 2022, chassis codes like F30 and year ranges like 2019-2022
+YEAR_LIKE_PATTERN = r"^(19|20)[0-9]{2}|^[A-Z][0-9]{2}$|^[0-9]{4}-[0-9]{4}$"
+
+
+async def find_menu_item(page, text, level=None, visible_only=True):
+    """Number of menu items whose text is exactly `text`."""
+    return await page.evaluate("([text, level, visibleOnly]) => window.__menuIndex.find(text, level, visibleOnly)",
+                               [text, level, visible_only])
+
+
+async def click_menu_item(page, text, level=None, last=False):
+    """Click the first (or last) visible menu item whose text is exactly `text`."""
+    return await page.evaluate("([text, level, last]) => window.__menuIndex.click(text, level, last)",
+                               [text, level, last])
+
+
+async def list_menu_items(page, level=None, pattern=None):
+    """Texts of the visible menu items, optionally only those matching the regex `pattern`."""
+    return await page.evaluate("([level, pattern]) => window.__menuIndex.list(level, pattern)",
+                               [level, pattern])
@@ -0,0 +1,454 @@
+import argparse
+import json
+import logging
+import random
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Product types offered by the real Product type dropdown
+PRODUCT_TYPES = ['MA600', 'MA800']
+
+# Vehicle configurations shown in the Engine/vehicle configuration/System field
+VEHICLE_CONFIGURATIONS = ['Sedan', 'SUV']
+
+# Calibration panels rotate through these CSC diagrams
+DIAGRAM_NAMES = ['CSC0601_01', 'CSC0602_01', 'CSC0605_01', 'CSC0800', 'CSC0806_01']
+
+CALIBRATION_TYPES = [
+    ['Static Calibration'],
+    ['Dynamic Calibration'],
+    ['Static Calibration', 'Dynamic Calibration'],
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Coverage</title>
+<style>
+  body { font-family: sans-serif; }
+  .field { margin: 8px 0; }
+  .dropbox-panel { display: flex; }
+  .dropbox { min-width: 180px; }
+  .dropbox ul { list-style: none; padding: 0; margin: 0; }
+  .dropbox li { padding: 2px 6px; cursor: pointer; }
+  .swiper-slide img { display: block; }
+</style>
+</head>
+<body>
+<div class="coverage">
+  <div class="field" id="product-field">
+    <input placeholder="Product type" readonly>
+    <div class="dropbox" style="display:none"><ul></ul></div>
+  </div>
+  <div class="field" id="make-field" style="display:none">
+    <input placeholder="Make/Model/Year" readonly>
+    <div class="dropbox-panel" style="display:none">
+      <div class="dropbox level1"><h3 class="title">Make</h3><ul></ul></div>
+      <div class="dropbox level2" style="display:none"><h3 class="title">Model</h3><ul></ul></div>
+      <div class="dropbox level3" style="display:none"><h3 class="title">Year</h3><ul></ul></div>
+    </div>
+  </div>
+  <div class="field" id="year-field" style="display:none">
+    <input placeholder="Year/System" readonly>
+  </div>
+  <div class="field" id="engine-field" style="display:none">
+    <input placeholder="Engine/vehicle configuration/System" readonly>
+    <div class="dropbox" style="display:none"><ul></ul></div>
+  </div>
+  <div class="field" id="system-field" style="display:none">
+    <input placeholder="System" readonly>
+    <div class="dropbox" style="display:none"><ul></ul></div>
+  </div>
+  <div class="calibration-container" style="display:none">
+    <div class="swiper"><div class="swiper-wrapper"></div></div>
+  </div>
+</div>
+<script>
+(function () {
+  var PRODUCT_TYPES = __PRODUCT_TYPES__;
+  var VEHICLE_CONFIGURATIONS = __VEHICLE_CONFIGURATIONS__;
+  var ENGINE_CONFIG_MAKES = __ENGINE_CONFIG_MAKES__;
+  var YEAR_MENU_MAKES = __YEAR_MENU_MAKES__;
+  var state = {make: null, model: null, year: null, engineStage: 'config'};
+
+  function $(selector, root) { return (root || document).querySelector(selector); }
+  function show(el) { el.style.display = ''; }
+  function hide(el) { el.style.display = 'none'; }
+
+  function api(path, params) {
+    var query = Object.keys(params || {}).map(function (key) {
+      return encodeURIComponent(key) + '=' + encodeURIComponent(params[key]);
+    }).join('&');
+    return fetch('/coverage/' + path + (query ? '?' + query : '')).then(function (r) { return r.json(); });
+  }
+
+  function fill(ul, items, onSelect) {
+    ul.innerHTML = '';
+    items.forEach(function (text) {
+      var li = document.createElement('li');
+      li.textContent = text;
+      li.addEventListener('click', function (event) {
+        event.stopPropagation();
+        onSelect(text);
+      });
+      ul.appendChild(li);
+    });
+  }
+
+  var productField = $('#product-field');
+  var makeField = $('#make-field');
+  var yearField = $('#year-field');
+  var engineField = $('#engine-field');
+  var systemField = $('#system-field');
+  var panel = $('.dropbox-panel', makeField);
+  var level1 = $('.dropbox.level1', makeField);
+  var level2 = $('.dropbox.level2', makeField);
+  var level3 = $('.dropbox.level3', makeField);
+  var calibration = $('.calibration-container');
+
+  function resetSystems() {
+    hide(engineField);
+    hide(systemField);
+    hide(calibration);
+    $('input', engineField).value = '';
+    $('input', systemField).value = '';
+    state.engineStage = 'config';
+  }
+
+  function renderPanel(system) {
+    api('panel', {make: state.make, model: state.model, year: state.year, system: system}).then(function (data) {
+      var wrapper = $('.swiper-wrapper', calibration);
+      wrapper.innerHTML = '';
+      var slide = document.createElement('div');
+      slide.className = 'swiper-slide';
+      data.types.forEach(function (type) {
+        var label = document.createElement('div');
+        label.className = 'calibration-type';
+        label.textContent = type;
+        slide.appendChild(label);
+      });
+      data.images.forEach(function (src) {
+        var img = document.createElement('img');
+        img.className = 'calibration-image';
+        img.src = src;
+        img.width = 400;
+        img.height = 240;
+        slide.appendChild(img);
+      });
+      wrapper.appendChild(slide);
+      show(calibration);
+    });
+  }
+
+  function selectSystem(field, system) {
+    $('input', field).value = system;
+    hide($('.dropbox', field));
+    renderPanel(system);
+  }
+
+  function openSystems(field) {
+    api('systems', {make: state.make, model: state.model, year: state.year}).then(function (systems) {
+      fill($('ul', field), systems, function (system) { selectSystem(field, system); });
+      show($('.dropbox', field));
+    });
+  }
+
+  $('input', productField).addEventListener('click', function () {
+    fill($('ul', productField), PRODUCT_TYPES, function (product) {
+      $('input', productField).value = product;
+      hide($('.dropbox', productField));
+      show(makeField);
+    });
+    show($('.dropbox', productField));
+  });
+
+  $('input', makeField).addEventListener('click', function () {
+    api('makes').then(function (makes) {
+      fill($('ul', level1), makes, function (make) {
+        state.make = make;
+        hide(level3);
+        hide(yearField);
+        resetSystems();
+        api('models', {make: make}).then(function (models) {
+          fill($('ul', level2), models, function (model) {
+            state.model = model;
+            resetSystems();
+            api('years', {make: make, model: model}).then(function (years) {
+              fill($('ul', level3), years, function (year) {
+                state.year = year;
+                $('input', makeField).value = make + '/' + model + '/' + year;
+                $('input', yearField).value = year;
+                hide(panel);
+                resetSystems();
+                if (ENGINE_CONFIG_MAKES.indexOf(make) !== -1) {
+                  show(engineField);
+                } else {
+                  show(systemField);
+                }
+              });
+              // Year/System makes list their years only once that field is clicked
+              if (YEAR_MENU_MAKES.indexOf(make) !== -1) {
+                hide(level3);
+                $('input', yearField).value = '';
+                show(yearField);
+              } else {
+                show(level3);
+              }
+            });
+          });
+          show(level2);
+        });
+      });
+      show(panel);
+    });
+  });
+
+  $('input', yearField).addEventListener('click', function () {
+    show(panel);
+    show(level3);
+  });
+
+  $('input', engineField).addEventListener('click', function () {
+    if (state.engineStage === 'system') {
+      openSystems(engineField);
+      return;
+    }
+    fill($('ul', engineField), VEHICLE_CONFIGURATIONS, function (config) {
+      $('input', engineField).value = config;
+      state.engineStage = 'system';
+      openSystems(engineField);
+    });
+    show($('.dropbox', engineField));
+  });
+
+  $('input', systemField).addEventListener('click', function () {
+    openSystems(systemField);
+  });
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def build_catalog(makes, models_per_make=5, years_per_model=5, systems=None,
+                  engine_config_makes=(), year_menu_makes=()):
+    """Build a synthetic coverage catalog.
+
+    `makes` are website make names (e.g. 'Honda(CANADA)'), `systems` maps a
+    website make to the system names offered for each of its years.  Years
+    of `year_menu_makes` are only listed after Year/System is clicked.  Panels
+    change every three model years so consecutive years share a diagram,
+    like they do on the real site.
+    """
+    systems = systems or {}
+    current_year = datetime.now().year
+    catalog = {}
+
+    for make in makes:
+        prefix = ''.join(c for c in make.upper() if c.isalpha())[:2]
+        make_systems = systems.get(make) or ['ACC', 'LDW']
+        models = {}
+        for model_index in range(1, models_per_make + 1):
+            model = f"{prefix}-{model_index:02d}"
+            if make in engine_config_makes:
+                model += " USA/CAN"
+            years = {}
+            for year in range(current_year, current_year - years_per_model, -1):
+                generation = (current_year - year) // 3
+                years[str(year)] = {
+                    system: {
+                        "types": CALIBRATION_TYPES[(model_index + system_index + generation) % len(CALIBRATION_TYPES)],
+                        "images": [DIAGRAM_NAMES[(model_index * 3 + system_index + generation) % len(DIAGRAM_NAMES)]],
+                    }
+                    for system_index, system in enumerate(make_systems)
+                }
+            models[model] = years
+        catalog[make] = {
+            "engine_config": make in engine_config_makes,
+            "year_menu": make in year_menu_makes,
+            "models": models,
+        }
+
+    return catalog
+
+
+def _png(width, height):
+    """Encode a plain greyscale PNG so diagram requests return a real image."""
+    rows = b''.join(
+        b'\x00' + bytes(255 if (x // 20 + y // 20) % 2 else 200 for x in range(width))
+        for y in range(height)
+    )
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+class MockCoverageSite:
+    """Local stand-in for getCoverage.jspx served from a background thread."""
+
+    def __init__(self, catalog, latency=0.0, jitter=0.0, host='127.0.0.1', port=0):
+        self.catalog = catalog
+        self.latency = latency
+        self.jitter = jitter
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._image = _png(400, 240)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/getCoverage.jspx"
+
+    def start(self):
+        """Start serving and return the coverage page URL."""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site._handle(self)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Mock site: {format % args}")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock coverage site running at {self.url}")
+        return self.url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            logger.info("Mock coverage site stopped")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _handle(self, request):
+        with self._lock:
+            self.request_count += 1
+
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        parsed = urlparse(request.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        if parsed.path == '/getCoverage.jspx':
+            self._send(request, 200, 'text/html; charset=utf-8', self._render_page().encode('utf-8'))
+        elif parsed.path.startswith('/coverage/'):
+            data = self._api(parsed.path[len('/coverage/'):], params)
+            if data is None:
+                self._send(request, 404, 'application/json', b'null')
+            else:
+                self._send(request, 200, 'application/json', json.dumps(data).encode('utf-8'))
+        elif parsed.path.startswith('/download1.auteltech.net/') and parsed.path.endswith('.png'):
+            self._send(request, 200, 'image/png', self._image)
+        else:
+            self._send(request, 404, 'text/plain', b'Not found')
+
+    def _send(self, request, status, content_type, body):
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _render_page(self):
+        engine_config_makes = [make for make, entry in self.catalog.items() if entry["engine_config"]]
+        year_menu_makes = [make for make, entry in self.catalog.items() if entry["year_menu"]]
+        return (PAGE_TEMPLATE
+                .replace('__PRODUCT_TYPES__', json.dumps(PRODUCT_TYPES))
+                .replace('__VEHICLE_CONFIGURATIONS__', json.dumps(VEHICLE_CONFIGURATIONS))
+                .replace('__ENGINE_CONFIG_MAKES__', json.dumps(engine_config_makes))
+                .replace('__YEAR_MENU_MAKES__', json.dumps(year_menu_makes)))
+
+    def _api(self, endpoint, params):
+        if endpoint == 'makes':
+            return list(self.catalog)
+
+        make = self.catalog.get(params.get('make'))
+        if make is None:
+            return None
+
+        if endpoint == 'models':
+            return list(make["models"])
+
+        years = make["models"].get(params.get('model'))
+        if years is None:
+            return None
+
+        if endpoint == 'years':
+            return list(years)
+
+        systems = years.get(params.get('year'))
+        if systems is None:
+            return None
+
+        if endpoint == 'systems':
+            return list(systems)
+
+        if endpoint == 'panel':
+            entry = systems.get(params.get('system'))
+            if entry is None:
+                return None
+            return {
+                "types": entry["types"],
+                "images": [f"http://{self.host}:{self.port}/download1.auteltech.net/diagrams/{name}.png"
+                           for name in entry["images"]],
+            }
+
+        return None
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Serve a local mock of the MaxiSys coverage site")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--makes', nargs='+', default=['Honda(CANADA)', 'Mazda', 'Subaru(US)', 'Toyota(USA)'])
+    parser.add_argument('--year-menu-makes', nargs='*', default=['Toyota(USA)'],
+                        help="Makes whose years sit behind the Year/System field")
+    parser.add_argument('--models', type=int, default=5, help="Models per make")
+    parser.add_argument('--years', type=int, default=5, help="Years per model")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every request")
+    args = parser.parse_args()
+
+    site = MockCoverageSite(build_catalog(args.makes, args.models, args.years,
+                                          year_menu_makes=args.year_menu_makes),
+                            latency=args.latency, port=args.port)
+    site.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
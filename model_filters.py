@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_filter_rules.json")
+
+
+def merge_rules(base, rules):
+    """`rules` layered over `base`: lists are concatenated, per-make rules merged, other values replaced."""
+    merged = dict(base)
+    for key, value in rules.items():
+        if key == "makes":
+            makes = dict(base.get("makes", {}))
+            for make, make_rules in value.items():
+                makes[make] = merge_rules(makes.get(make, {}), make_rules)
+            merged["makes"] = makes
+        elif isinstance(value, list):
+            merged[key] = base.get(key, []) + value
+        else:
+            merged[key] = value
+    return merged
+
+
+def combine(patterns):
+    """Compile a list of regexes into one alternation, or None if the list is empty."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def combine_keywords(keywords):
+    """Compile literal keywords into one regex that finds any of them in a single scan."""
+    # Longest first so overlapping keywords (FM/FMX) don't shadow each other
+    return combine([re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)])
+
+
+class MakeRules:
+    """Extra rules for one make. Keywords match the name as listed, patterns the upper-cased name."""
+
+    def __init__(self, rules):
+        self.always_allow = {name.upper() for name in rules.get("always_allow", [])}
+        self.require = combine_keywords(rules.get("require_keywords", []))
+        self.deny_keywords = combine_keywords(rules.get("deny_keywords", []))
+        self.deny_patterns = combine(rules.get("deny_patterns", []))
+
+
+class ModelFilter:
+    """One compiled section of model_filter_rules.json.
+
+    A model is kept when, in order:
+    - it is in its make's `always_allow` list (kept), or
+    - it passes its make's `require_keywords`, `deny_keywords` and `deny_patterns`, and
+    - it matches an `allow_patterns` entry (kept), or else
+    - no `deny_keywords` occur in the upper-cased name, no `deny_patterns`
+      match it, it matches `require_pattern` if set, and it is not blank.
+    """
+
+    def __init__(self, rules):
+        self.allowed_makes = {make.upper() for make in rules.get("allowed_makes", [])}
+        self.allow_patterns = combine(rules.get("allow_patterns", []))
+        self.deny_keywords = combine_keywords(rules.get("deny_keywords", []))
+        self.deny_patterns = combine(rules.get("deny_patterns", []))
+        self.require_pattern = combine([rules["require_pattern"]] if rules.get("require_pattern") else [])
+        self.makes = {make.upper(): MakeRules(make_rules) for make, make_rules in rules.get("makes", {}).items()}
+
+    @classmethod
+    def load(cls, section, path=DEFAULT_RULES_PATH):
+        """Compile one section; a section with `extends` adds its rules to the named section's."""
+        with open(path, "r", encoding="utf-8") as f:
+            sections = json.load(f)
+        rules = sections[section]
+        while "extends" in rules:
+            rules = merge_rules(sections[rules["extends"]], {k: v for k, v in rules.items() if k != "extends"})
+        return cls(rules)
+
+    def is_allowed_make(self, make):
+        return make.upper() in self.allowed_makes
+
+    def is_valid(self, model, make):
+        upper_model = model.upper()
+        make_rules = self.makes.get(make.upper())
+        if make_rules:
+            if upper_model in make_rules.always_allow:
+                return True
+            if make_rules.require and not make_rules.require.search(model):
+                return False
+            if make_rules.deny_keywords and make_rules.deny_keywords.search(model):
+                return False
+            if make_rules.deny_patterns and make_rules.deny_patterns.search(upper_model):
+                return False
+
+        if self.allow_patterns and self.allow_patterns.match(model):
+            return True
+        if self.deny_keywords and self.deny_keywords.search(upper_model):
+            return False
+        if self.deny_patterns and self.deny_patterns.match(model):
+            return False
+        if self.require_pattern and not self.require_pattern.match(model):
+            return False
+        return bool(model.strip())
+
+    def filter(self, models, make):
+        """Models that pass, in their original order."""
+        kept = []
+        for model in models:
+            if self.is_valid(model, make):
+                kept.append(model)
+            else:
+                logger.debug(f"Skipping {make} model: {model}")
+        return kept
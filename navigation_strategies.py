@@ -0,0 +1,58 @@
+from dataclasses import dataclass, replace
+from typing import FrozenSet, Optional
+
+TABLE = "table"
+DROPDOWN = "dropdown"
+
+
+@dataclass(frozen=True)
+class NavigationPlan:
+    """How the coverage menus behave for one manufacturer.
+
+    `model_layout` and `year_layout` say whether models and years are shown
+    as a clickable table or only in a dropdown. None means not known yet:
+    the scraper probes the page once, and replaces the plan with the layout
+    it found, so later tasks go straight to the right path.
+    """
+    model_layout: Optional[str] = None
+    year_layout: Optional[str] = None
+    # Year/System has to be clicked before years are listed (Toyota, Lexus)
+    open_year_menu: bool = False
+    # Models whose Year/System menu lists three-letter model codes instead of years
+    model_code_models: FrozenSet[str] = frozenset()
+    # An Engine/vehicle configuration level comes before the systems (Audi, VW)
+    vehicle_config: bool = False
+    # An engine has to be picked before ACC/LDW can be (Kia, Hyundai, Genesis)
+    engine_step: bool = False
+    # The System dropdown closes after every selection and has to be reopened
+    reopen_system_menu: bool = False
+    # Models named like the make, which appear twice in the menus (MINI)
+    duplicate_models: FrozenSet[str] = frozenset()
+
+    def with_layout(self, step, layout):
+        """A copy with the model or year layout filled in."""
+        return replace(self, **{f"{step}_layout": layout})
+
+
+DEFAULT_PLAN = NavigationPlan()
+
+STRATEGIES = {
+    'AUDI': NavigationPlan(vehicle_config=True, reopen_system_menu=True),
+    'VOLKSWAGEN': NavigationPlan(vehicle_config=True, reopen_system_menu=True),
+    'BMW': NavigationPlan(reopen_system_menu=True),
+    'GENESIS': NavigationPlan(engine_step=True),
+    'HYUNDAI': NavigationPlan(engine_step=True),
+    'KIA': NavigationPlan(engine_step=True),
+    'LEXUS': NavigationPlan(open_year_menu=True, model_code_models=frozenset({'IS500', 'LC500', 'LC500c'})),
+    'MINI': NavigationPlan(duplicate_models=frozenset({'MINI'})),
+    'TOYOTA': NavigationPlan(open_year_menu=True),
+}
+
+
+def register(manufacturer, plan):
+    STRATEGIES[manufacturer.upper()] = plan
+
+
+def resolve(manufacturer):
+    """The navigation plan for a manufacturer; the default plan if it needs nothing special."""
+    return STRATEGIES.get((manufacturer or '').upper(), DEFAULT_PLAN)
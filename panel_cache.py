@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def panel_hash(texts, image_urls):
+    """Hash of a calibration panel's text and diagram URLs, or None if the panel is empty."""
+    texts = [text.strip() for text in texts if text and text.strip()]
+    if not texts and not image_urls:
+        return None
+    content = json.dumps({"texts": texts, "images": sorted(image_urls)}, ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class PanelCache:
+    """ADAS values derived from calibration panels, keyed by panel content hash.
+
+    Consecutive years of a model usually show the same panel, so a hit
+    skips the calibration type detection and the CSC OCR entirely.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading panel cache from {self.path}: {e}")
+            return {}
+
+    def get(self, key):
+        if key is not None and key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if key is not None and value:
+            self.entries[key] = value
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def log_stats(self):
+        logger.info(f"Panel cache: {self.hits} hits, {self.misses} misses "
+                    f"({self.hit_rate:.0%} hit rate), {len(self.entries)} entries")
+
+    def save(self):
+        """Persist the cache, keeping entries other processes saved in the meantime."""
+        entries = self._load()
+        entries.update(self.entries)
+        self.entries = entries
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
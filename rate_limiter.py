@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """In-process token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1):
+        """Wait until `tokens` are available and take them."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in a SQLite file shared by several processes."""
+
+    def __init__(self, path, name, rate, capacity=None):
+        self.path = path
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _try_acquire(self, tokens):
+        """Take tokens if available; return 0 on success or the seconds to wait."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            if row is None:
+                available = self.capacity
+            else:
+                available = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+
+            if available >= tokens:
+                available -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens - available) / self.rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                (self.name, available, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    async def acquire(self, tokens=1):
+        """Wait until `tokens` are available in the shared bucket and take them."""
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Separate token buckets per host, shared by every worker that holds this limiter.
+
+    `host_rates` maps a host name to requests per second, or to None for a
+    host that is not limited at all; other hosts use `default_rate`. With
+    `shared_path` the buckets are kept in a SQLite file
+    so several scraper processes draw from the same budget.
+    """
+
+    def __init__(self, default_rate=2.0, host_rates=None, shared_path=None, burst=None):
+        self.default_rate = default_rate
+        self.host_rates = host_rates or {}
+        self.shared_path = shared_path
+        self.burst = burst
+        self._buckets = {}
+
+    def bucket(self, host):
+        if host not in self._buckets:
+            rate = self.host_rates.get(host, self.default_rate)
+            if rate is None:
+                logger.info(f"Not rate limiting {host}")
+                self._buckets[host] = None
+                return None
+            if self.shared_path:
+                self._buckets[host] = SQLiteTokenBucket(self.shared_path, host, rate, self.burst)
+            else:
+                self._buckets[host] = TokenBucket(rate, self.burst)
+            logger.info(f"Rate limiting {host} to {rate:g} requests/s"
+                        f"{' (shared)' if self.shared_path else ''}")
+        return self._buckets[host]
+
+    async def acquire(self, url):
+        """Wait for permission to send a request to the host of `url`."""
+        bucket = self.bucket(urlparse(url).hostname or url)
+        if bucket:
+            await bucket.acquire()
@@ -0,0 +1,118 @@
+import logging
+import re
+from datetime import datetime
+
+from scrape_tasks import ADAS_KEYS
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Decides which YMMs are due for a refresh and in which order.
+
+    A YMM's priority combines three inputs:
+    - recency: how new its model year is (chassis codes count as mid-range)
+    - staleness: age of the latest `last_scraped`/`last_checked` relative
+      to the make's TTL
+    - previous failure: a `last_failed` newer than the last successful scrape
+    Records never scraped are always due and rank above stale ones.
+    """
+
+    RECENCY_WEIGHT = 1.0
+    STALENESS_WEIGHT = 1.0
+    FAILURE_WEIGHT = 0.5
+
+    # Staleness assigned to records that have never been scraped
+    NEVER_SCRAPED_STALENESS = 3.0
+
+    # Model years older than this many years get no recency bonus
+    RECENCY_HORIZON = 30
+
+    def __init__(self, default_ttl_days=30, ttl_by_make=None, now=None):
+        self.default_ttl_days = default_ttl_days
+        self.ttl_by_make = ttl_by_make or {}
+        self.now = now or datetime.now()
+
+    def ttl_days(self, manufacturer):
+        return self.ttl_by_make.get(manufacturer, self.default_ttl_days)
+
+    def recency(self, year_or_chassis):
+        match = re.search(r'(19|20)[0-9]{2}', year_or_chassis or '')
+        if not match:
+            return 0.5
+        age = max(0, self.now.year - int(match.group(0)))
+        return max(0.0, 1.0 - age / self.RECENCY_HORIZON)
+
+    @staticmethod
+    def has_data(record):
+        return bool(record) and all(key in record for key in ADAS_KEYS)
+
+    def staleness(self, manufacturer, record):
+        """Age of the record in TTLs; 1.0 means it just expired."""
+        if not self.has_data(record):
+            return self.NEVER_SCRAPED_STALENESS
+
+        # A check that found the system menu unchanged refreshes the record too
+        seen = [t for t in (self._parse_time(record.get("last_scraped")),
+                            self._parse_time(record.get("last_checked"))) if t is not None]
+        if not seen:
+            # Scraped before timestamps were recorded
+            return 1.0
+
+        age_days = (self.now - max(seen)).total_seconds() / 86400
+        return min(self.NEVER_SCRAPED_STALENESS, age_days / max(self.ttl_days(manufacturer), 1e-9))
+
+    def failed_last_time(self, record):
+        if not record:
+            return False
+        last_failed = self._parse_time(record.get("last_failed"))
+        if last_failed is None:
+            return False
+        last_scraped = self._parse_time(record.get("last_scraped"))
+        return last_scraped is None or last_failed > last_scraped
+
+    def is_due(self, manufacturer, record):
+        """True if a YMM has no data, has outlived its TTL or failed last time."""
+        return self.staleness(manufacturer, record) >= 1.0 or self.failed_last_time(record)
+
+    def priority(self, manufacturer, year_or_chassis, record):
+        return (self.RECENCY_WEIGHT * self.recency(year_or_chassis) +
+                self.STALENESS_WEIGHT * self.staleness(manufacturer, record) +
+                self.FAILURE_WEIGHT * self.failed_last_time(record))
+
+    def model_priority(self, manufacturer, model_data):
+        """Priority of discovering a model: that of its most urgent known year."""
+        years = self.known_years(model_data)
+        if not years:
+            return self.RECENCY_WEIGHT + self.STALENESS_WEIGHT * self.NEVER_SCRAPED_STALENESS
+        return max(self.priority(manufacturer, year, model_data.get(year)) for year in years)
+
+    def manufacturer_priority(self, manufacturer, manufacturer_data):
+        models = (manufacturer_data or {}).get("models", {})
+        if not models:
+            return self.model_priority(manufacturer, {})
+        return max(self.model_priority(manufacturer, model_data) for model_data in models.values())
+
+    def order_manufacturers(self, manufacturers, load_results):
+        """Order manufacturers by the priority of their most urgent stored YMM."""
+        priorities = {m: self.manufacturer_priority(m, load_results(m)) for m in manufacturers}
+        ordered = sorted(manufacturers, key=lambda m: -priorities[m])
+        logger.info("Manufacturer refresh order: " +
+                    ", ".join(f"{m} ({priorities[m]:.2f})" for m in ordered))
+        return ordered
+
+    @staticmethod
+    def known_years(model_data):
+        for key in ("years", "year", "chassis", "model_designation"):
+            if model_data.get(key):
+                return model_data[key]
+        return []
+
+    @staticmethod
+    def _parse_time(value):
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeError(Exception):
+    """Base class for classified scraper failures."""
+    kind = "unknown"
+    retryable = True
+
+
+class ScrapeTimeoutError(ScrapeError):
+    """A wait on the page ran out of time."""
+    kind = "timeout"
+
+
+class SelectorNotFoundError(ScrapeError):
+    """An element the navigation depends on could not be found or clicked."""
+    kind = "selector_not_found"
+
+
+class NavigationError(ScrapeError):
+    """The coverage page could not be loaded."""
+    kind = "navigation"
+
+
+class DeadlineExceededError(BaseException):
+    """The task ran out of its time budget; it is re-queued rather than retried straight away.
+
+    Like asyncio.CancelledError it derives from BaseException, so the
+    scraper's `except Exception` fallbacks let it through instead of
+    swallowing it. It carries the same `kind` and `retryable` as a ScrapeError.
+    """
+    kind = "deadline"
+    retryable = False
+
+
+class CircuitOpenError(ScrapeError):
+    """The manufacturer's circuit breaker is open; the task was not attempted."""
+    kind = "circuit_open"
+    retryable = False
+
+
+def classify_error(error):
+    """Map an arbitrary exception onto one of the ScrapeError classes."""
+    if isinstance(error, (ScrapeError, DeadlineExceededError)):
+        return error
+
+    message = str(error) or type(error).__name__
+    lowered = message.lower()
+
+    if isinstance(error, TimeoutError) or type(error).__name__ == 'TimeoutError' or 'timeout' in lowered:
+        classified = ScrapeTimeoutError(message)
+    elif 'net::' in message or 'navigat' in lowered or 'page.goto' in lowered:
+        classified = NavigationError(message)
+    elif 'selector' in lowered or 'could not find' in lowered:
+        classified = SelectorNotFoundError(message)
+    else:
+        classified = ScrapeError(message)
+
+    classified.__cause__ = error
+    return classified
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter and a per-task attempt budget.
+
+    `max_attempts` bounds the attempts made in one pass over a task;
+    `task_budget` bounds the attempts across all passes once a task has
+    been re-queued.
+    """
+
+    def __init__(self, max_attempts=3, task_budget=6, base_delay=1.0, max_delay=30.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.task_budget = task_budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def backoff(self, attempt):
+        """Delay before retrying after the given (1-based) failed attempt."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def has_budget(self, task):
+        return task.attempts < self.task_budget
+
+    async def run(self, operation, task, breaker=None):
+        """Run `operation` for `task`, retrying classified failures.
+
+        Raises the classified error once the pass or task budget is spent,
+        or CircuitOpenError if the manufacturer's breaker opens meanwhile.
+        """
+        attempts_this_pass = 0
+        while True:
+            if breaker and not breaker.allow(task.manufacturer):
+                if breaker.probe_in_flight(task.manufacturer):
+                    # Half-open: wait for the probe's outcome instead of giving up on the task
+                    await breaker.wait_for_probe(task.manufacturer)
+                    continue
+                raise CircuitOpenError(f"Circuit open for {task.manufacturer}")
+
+            attempts_this_pass += 1
+            task.attempts += 1
+            try:
+                result = await operation()
+            except asyncio.CancelledError:
+                if breaker:
+                    breaker.abandon_probe(task.manufacturer)
+                raise
+            except (Exception, DeadlineExceededError) as e:
+                error = classify_error(e)
+                task.last_error = f"{error.kind}: {error}"
+                if breaker:
+                    breaker.record_failure(task.manufacturer)
+
+                if (not error.retryable or attempts_this_pass >= self.max_attempts
+                        or not self.has_budget(task) or (breaker and not breaker.is_closed(task.manufacturer))):
+                    raise error
+
+                delay = self.backoff(attempts_this_pass)
+                logger.warning(f"{task} failed with {error.kind} (attempt {task.attempts}/{self.task_budget}), "
+                               f"retrying in {delay:.1f}s: {error}")
+                await asyncio.sleep(delay)
+                continue
+
+            if breaker:
+                breaker.record_success(task.manufacturer)
+            return result
+
+
+class CircuitBreaker:
+    """Per-manufacturer breaker that pauses a make after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens for
+    `cooldown` seconds. Once the cooldown has passed it is half-open:
+    `allow` admits exactly one probe task and holds the others back until
+    the probe finishes. Success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=300.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened_at = {}
+        self._probes = {}
+
+    def is_open(self, key):
+        return key in self._opened_at and self.remaining_cooldown(key) > 0
+
+    def is_closed(self, key):
+        return key not in self._opened_at
+
+    def probe_in_flight(self, key):
+        return key in self._probes
+
+    def remaining_cooldown(self, key):
+        opened_at = self._opened_at.get(key)
+        if opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - opened_at))
+
+    def allow(self, key):
+        """True if a task for `key` may run now; in the half-open state only the first caller gets True."""
+        if self.is_closed(key):
+            return True
+        if self.is_open(key) or self.probe_in_flight(key):
+            return False
+        logger.info(f"Circuit half-open for {key}, letting one probe task through")
+        self._probes[key] = asyncio.Event()
+        return True
+
+    async def wait_for_probe(self, key):
+        probe = self._probes.get(key)
+        if probe:
+            await probe.wait()
+
+    def _finish_probe(self, key):
+        probe = self._probes.pop(key, None)
+        if probe:
+            probe.set()
+
+    def abandon_probe(self, key):
+        """The probe was cancelled without an outcome; the next caller becomes the probe."""
+        self._finish_probe(key)
+
+    def record_success(self, key):
+        if key in self._opened_at:
+            logger.info(f"Circuit closed for {key}")
+        self._failures[key] = 0
+        self._opened_at.pop(key, None)
+        self._finish_probe(key)
+
+    def record_failure(self, key):
+        self._failures[key] = self._failures.get(key, 0) + 1
+        half_open = key in self._opened_at
+        if half_open or self._failures[key] >= self.failure_threshold:
+            self._opened_at[key] = time.monotonic()
+            logger.warning(f"Circuit opened for {key} after {self._failures[key]} failures, "
+                           f"pausing for {self.cooldown:.0f}s")
+        self._finish_probe(key)
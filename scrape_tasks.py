@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Optional
+
+ADAS_KEYS = [
+    "adas_blind_spot_monitor", "adas_windshield_camera",
+    "adas_front_radar", "adas_360_camera"
+]
+
+
+@dataclass
+class ScrapeTask:
+    """A unit of scraper work.
+
+    Without `model` the task lists a make's models; without
+    `year_or_chassis` the task discovers the model's years/chassis;
+    with it the task scrapes the ADAS calibration data for that one YMM.
+    Catalog tasks only walk the menus and record what they find.
+    `deadline` is the monotonic time the current YMM attempt must finish by.
+    """
+    manufacturer: str
+    website_make: str
+    model: str
+    year_or_chassis: Optional[str] = None
+    priority: float = 0.0
+    attempts: int = 0
+    last_error: Optional[str] = None
+    catalog_only: bool = False
+    deadline: Optional[float] = None
+
+    @property
+    def is_discovery(self):
+        return self.year_or_chassis is None
+
+    def to_dict(self):
+        return {
+            "manufacturer": self.manufacturer,
+            "model": self.model,
+            "year_or_chassis": self.year_or_chassis,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+        }
+
+    def __str__(self):
+        return " - ".join(part for part in (self.manufacturer, self.model, self.year_or_chassis) if part)
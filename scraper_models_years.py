@@ -1,5 +1,9 @@
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import argparse
 import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import os
 import random
 from datetime import datetime
@@ -11,9 +15,29 @@ import pytesseract
 from PIL import Image
 import io
 import requests
+from urllib.parse import urlparse
+from catalog_store import CatalogStore, assign_shard, parse_shard
+from catalog_fingerprints import FingerprintStore, make_menu_key, model_menu_key, ymm_menu_key
+from concurrency_controller import AdaptiveConcurrencyController
+from menu_index import MENU_INDEX_SCRIPT, YEAR_LIKE_PATTERN, click_menu_item, find_menu_item, list_menu_items
+from model_filters import ModelFilter
+from navigation_strategies import DROPDOWN, TABLE, resolve as resolve_navigation
+from panel_cache import PanelCache, panel_hash
+from rate_limiter import RateLimiter
+from retry_policy import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, NavigationError, RetryPolicy,
+    ScrapeError, SelectorNotFoundError, classify_error
+)
+from refresh_scheduler import RefreshScheduler
+from scrape_tasks import ScrapeTask
+from selector_cache import SelectorCache
+from selector_race import race_selectors
+from timeout_policy import TimeoutPolicy
 
-# Set up Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Set up Tesseract path: TESSERACT_CMD, else the default Windows install, else tesseract on the PATH
+DEFAULT_TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+pytesseract.pytesseract.tesseract_cmd = os.environ.get('TESSERACT_CMD') or (
+    DEFAULT_TESSERACT_CMD if os.path.exists(DEFAULT_TESSERACT_CMD) else 'tesseract')
 
 # Set up logging
 logging.basicConfig(
@@ -26,6 +50,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Deadline (time.monotonic()) of the YMM attempt running in the current asyncio task, if any
+current_deadline = ContextVar("current_deadline", default=None)
+
 class ModelYearScraper:
     # Define make mappings
     MAKE_MAPPINGS = {
@@ -83,15 +110,6 @@ class ModelYearScraper:
     # Manufacturers that don't use years (only models with their ranges in the model name)
     NO_YEAR_MANUFACTURERS = {'PORSCHE', 'MERCEDES-BENZ'}
 
-    # Special models that use model codes instead of years
-    MODEL_CODE_MODELS = {
-        'LEXUS': {
-            'IS500': 'model_code',
-            'LC500': 'model_code',
-            'LC500c': 'model_code'
-        }
-    }
-
     # List of manufacturers to scrape
     MANUFACTURERS = [
         'GENESIS', 'GMC', 'HONDA', 'HYUNDAI', 'INFINITI', 'JAGUAR', 'JEEP',
@@ -113,11 +131,59 @@ class ModelYearScraper:
         'LD', 'EU', 'JP', 'CN', 'EN', 'TH', 'IN'
     ]
 
-    def __init__(self):
+    # Coverage page the scraper navigates to for every task
+    COVERAGE_URL = "https://www.maxisysadas.com/getCoverage.jspx"
+
+    # Number of passes over re-queued tasks at the end of a run
+    MAX_RETRY_PASSES = 2
+
+    # Used for calibrate-phase estimates until a run has measured the real cost
+    DEFAULT_SECONDS_PER_YMM = 60
+
+    # Seconds one attempt at a YMM may take before it is cancelled and re-queued
+    DEFAULT_YMM_BUDGET = 300
+
+    # Requests per second allowed to each host, shared by all workers
+    HOST_RATE_LIMITS = {
+        'www.maxisysadas.com': 1.0,
+        'download1.auteltech.net': 4.0
+    }
+
+    def __init__(self, coverage_url=None, headless=False, retry_policy=None, circuit_breaker=None,
+                 concurrency=None, rate_limiter=None, scheduler=None, full_refresh=False,
+                 ymm_budget=DEFAULT_YMM_BUDGET, ocr_enabled=True):
+        self.coverage_url = coverage_url or self.COVERAGE_URL
+        self.headless = headless
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.concurrency = concurrency or AdaptiveConcurrencyController()
+        self.rate_limiter = rate_limiter or RateLimiter(host_rates=self.HOST_RATE_LIMITS)
+        self.scheduler = scheduler or RefreshScheduler()
+        self.run_deadline = None
+        self.deferred_tasks = 0
+        self.ymm_budget = ymm_budget
+        # Without OCR no CSC codes are read, and the calibration type is stored instead
+        self.ocr_enabled = ocr_enabled
+        self.deadline_overruns = 0
+        self.retry_queue = []
+        self.failed_tasks = []
         self.debug_dir = "model_scraper_debug"
         self.results_dir = "model_scraper_results"
         self.results = {}
         self.ensure_directories()
+        self.full_refresh = full_refresh
+        self.fingerprints = FingerprintStore(os.path.join(self.results_dir, "menu_fingerprints.json"))
+        self.catalog = CatalogStore(os.path.join(self.results_dir, "catalog.json"))
+        self.ymm_durations = []
+        self.panel_cache = PanelCache(os.path.join(self.results_dir, "panel_cache.json"))
+        self.selector_cache = SelectorCache(os.path.join(self.results_dir, "selector_cache.json"))
+        self.timeouts = TimeoutPolicy(os.path.join(self.results_dir, "timeout_samples.json"))
+        # Coverage-site model rules, shared with generate_vehicle_options via model_filter_rules.json.
+        # The table path also picks up page text, so it adds a name-shape check and the Mercedes LD rule.
+        self.model_filter = ModelFilter.load("coverage")
+        self.table_model_filter = ModelFilter.load("coverage_table")
+        # Per-manufacturer navigation plans, resolved once and refined as layouts are seen
+        self.navigation_plans = {}
         self.browser = None
         self.context = None
         self.page = None
@@ -185,11 +251,78 @@ class ModelYearScraper:
         logger.info(f"Converted database make '{database_make}' to website make '{website_make}'")
         return website_make
 
+    def navigation_plan(self, manufacturer):
+        """The navigation plan for a manufacturer, resolved on first use."""
+        if manufacturer not in self.navigation_plans:
+            self.navigation_plans[manufacturer] = resolve_navigation(manufacturer)
+        return self.navigation_plans[manufacturer]
+
+    def learn_layout(self, manufacturer, step, layout):
+        """Remember whether a manufacturer's models or years are a table or a dropdown."""
+        plan = self.navigation_plan(manufacturer)
+        if manufacturer and getattr(plan, f"{step}_layout") is None:
+            logger.info(f"{manufacturer} {step} menu is a {layout}; skipping the layout probe from now on")
+            self.navigation_plans[manufacturer] = plan.with_layout(step, layout)
+
+    def forget_layout(self, manufacturer, step):
+        """Drop a remembered layout that turned out wrong, so the next lookup probes the page again."""
+        logger.warning(f"{manufacturer} {step} menu is not the remembered "
+                       f"{getattr(self.navigation_plan(manufacturer), f'{step}_layout')}; probing again")
+        self.navigation_plans[manufacturer] = self.navigation_plan(manufacturer).with_layout(step, None)
+
+    def remaining_budget(self):
+        """Seconds left for the current YMM attempt, or None if it has no deadline.
+
+        Raises DeadlineExceededError once the deadline has passed.
+        """
+        deadline = current_deadline.get()
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError("YMM time budget spent")
+        return remaining
+
+    async def ocr(self, img):
+        """OCR an image off the event loop, killing tesseract if it outlives the task's budget."""
+        if not self.ocr_enabled:
+            return ""
+        remaining = self.remaining_budget()
+        return await asyncio.to_thread(pytesseract.image_to_string, img, timeout=remaining)
+
+    def step_timeout(self, step, default_ms, host=None):
+        """(timeout in ms, capped) for the next wait of `step`, capped by the task's remaining budget."""
+        timeout = self.timeouts.timeout(step, default_ms, host)
+        remaining = self.remaining_budget()
+        if remaining is not None and remaining * 1000 < timeout:
+            return max(1, int(remaining * 1000)), True
+        return timeout, False
+
+    async def wait_for(self, page, selector, step, default_ms, expected=True):
+        """wait_for_selector with the learned timeout for `step`, recording how long it took.
+
+        `expected` waits are for elements that should appear; a timeout on
+        one is recorded as a censored sample. Optional probes that are
+        allowed to miss pass expected=False and only record their hits.
+        """
+        host = urlparse(page.url).netloc or None
+        timeout, capped = self.step_timeout(step, default_ms, host)
+        start = time.monotonic()
+        try:
+            element = await page.wait_for_selector(selector, timeout=timeout)
+        except PlaywrightTimeoutError:
+            # A wait cut short by the task's deadline says nothing about the step's latency
+            if expected and not capped:
+                self.timeouts.record_timeout(step, timeout, host)
+            raise
+        self.timeouts.record(step, (time.monotonic() - start) * 1000, host)
+        return element
+
     async def select_make(self, page, make):
         """Select a make from the dropdown."""
         try:
             # Click the main Make/Model/Year input to open the panel
-            main_dropdown = await page.wait_for_selector("input[placeholder='Make/Model/Year']", timeout=3000)
+            main_dropdown = await self.wait_for(page, "input[placeholder='Make/Model/Year']", "make_menu", 3000)
             await main_dropdown.click()
             
             # Handle Make selection
@@ -201,20 +334,34 @@ class ModelYearScraper:
                 selectors = [
                     "//li[text()='Mercedes Benz']",  # Exact match for Mercedes Benz
                     "//li[normalize-space(text())='Mercedes Benz']",  # Normalized space match
-                    "//li[contains(text(), 'Mercedes') and not(contains(text(), 'LD'))]"  # Contains Mercedes but not LD
                 ]
-                
-                make_element = None
-                for selector in selectors:
-                    try:
-                        logger.info(f"Trying Mercedes Benz selector: {selector}")
-                        make_element = await page.wait_for_selector(selector, timeout=2000)
-                        if make_element:
-                            logger.info(f"Found Mercedes Benz element with selector: {selector}")
-                            break
-                    except Exception as e:
-                        logger.debug(f"Selector {selector} failed: {e}")
-                        continue
+                # Only if neither exact match shows up: contains Mercedes but not LD
+                loose_selector = "//li[contains(text(), 'Mercedes') and not(contains(text(), 'LD'))]"
+
+                async def is_mercedes_benz(element):
+                    text = (await element.text_content() or '').strip()
+                    return text.startswith('Mercedes') and 'LD' not in text
+
+                # Race the exact ones, so a wrong first choice costs one timeout instead of two
+                selectors = self.selector_cache.order(make, "make", selectors)
+                host = urlparse(page.url).netloc or None
+                timeout, _ = self.step_timeout("make_option", 2000, host)
+                start = time.monotonic()
+                index, make_element, misses = await race_selectors(page, selectors, timeout=timeout)
+                for miss in misses:
+                    self.selector_cache.record(make, "make", selectors[miss], False)
+                if make_element:
+                    self.timeouts.record("make_option", (time.monotonic() - start) * 1000, host)
+                else:
+                    selectors.append(loose_selector)
+                    timeout, _ = self.step_timeout("make_option", 2000, host)
+                    index, make_element, _ = await race_selectors(page, [loose_selector], timeout=timeout,
+                                                                  accept=is_mercedes_benz)
+                    if make_element:
+                        index = len(selectors) - 1
+                if make_element:
+                    logger.info(f"Found Mercedes Benz element with selector: {selectors[index]}")
+                    self.selector_cache.record(make, "make", selectors[index], True)
                 
                 if not make_element:
                     # If no selector worked, try to find all visible makes to help debug
@@ -228,7 +375,7 @@ class ModelYearScraper:
                     return False
             else:
                 make_selector = f"text={make}"
-                make_element = await page.wait_for_selector(make_selector, timeout=2000)
+                make_element = await self.wait_for(page, make_selector, "make_option", 2000)
             
             if not make_element:
                 logger.error(f"Could not find Make option: {make}")
@@ -241,11 +388,11 @@ class ModelYearScraper:
             # Wait for the model dropdown to appear using a more reliable selector
             try:
                 # Wait for either the model dropdown or model list to be visible
-                model_visible = await page.wait_for_selector("""
+                model_visible = await self.wait_for(page, """
                     .dropbox.level2:visible, 
                     .model-list:visible, 
                     .model-column:visible
-                """, timeout=2000)  # Reduced timeout since this should appear quickly after make selection
+                """, "model_menu", 2000, expected=False)  # Short default since this should appear quickly after make selection
                 
                 if model_visible:
                     logger.info("Model dropdown/list is visible")
@@ -331,33 +478,7 @@ class ModelYearScraper:
                 logger.info("Using models from table format instead of dropdown")
                 
                 # Filter out any non-model items that might have been picked up
-                filtered_models = []
-                for model in table_models:
-                    # Skip common non-model text
-                    if any(skip in model.upper() for skip in ['SUPPORT', 'VIDEO', 'DOWNLOADS', 'CONTACT', 'PRODUCTS']):
-                        continue
-                
-                    # For Audi and Volkswagen, only include models with USA/CAN in their name
-                    if manufacturer in {'AUDI', 'VOLKSWAGEN'}:
-                        if not ('USA' in model or 'CAN' in model):
-                            logger.debug(f"Skipping non-USA/CAN {manufacturer} model: {model}")
-                            continue
-                    
-                    # For Mercedes-Benz, skip models from Mercedes-Benz LD
-                    if manufacturer == 'MERCEDES-BENZ' and 'LD' in model:
-                        logger.debug(f"Skipping Mercedes-Benz LD model: {model}")
-                        continue
-                    
-                    # For Jeep, Ram, Dodge, and Chrysler, skip models with parentheses
-                    if manufacturer in {'JEEP', 'RAM', 'DODGE', 'CHRYSLER'}:
-                        if '(' in model and ')' in model:
-                            logger.debug(f"Skipping {manufacturer} model with parentheses: {model}")
-                            continue
-                    
-                    # For regular models, check if it matches common patterns
-                    if (re.match(r'^[A-Z0-9].*', model) and  # Starts with letter or number
-                          len(model) >= 2):  # At least 2 characters long
-                        filtered_models.append(model)
+                filtered_models = self.table_model_filter.filter(table_models, manufacturer)
                 
                 if filtered_models:
                     logger.info(f"Filtered to {len(filtered_models)} models: {filtered_models}")
@@ -434,25 +555,7 @@ class ModelYearScraper:
             logger.info(f"Raw models found (may include hidden items): {len(models)}")
             
             # Filter models based on manufacturer
-            filtered_models = []
-            for model in models:
-                # Skip common non-model text
-                if any(skip in model.upper() for skip in ['SUPPORT', 'VIDEO', 'DOWNLOADS', 'CONTACT', 'PRODUCTS']):
-                    continue
-                
-                # For Audi and Volkswagen, only include models with USA/CAN in their name
-                if manufacturer in {'AUDI', 'VOLKSWAGEN'}:
-                    if not ('USA' in model or 'CAN' in model):
-                        logger.debug(f"Skipping non-USA/CAN {manufacturer} model: {model}")
-                        continue
-                
-                # For Jeep, Ram, Dodge, and Chrysler, skip models with parentheses
-                if manufacturer in {'JEEP', 'RAM', 'DODGE', 'CHRYSLER'}:
-                    if '(' in model and ')' in model:
-                        logger.debug(f"Skipping {manufacturer} model with parentheses: {model}")
-                        continue
-                
-                filtered_models.append(model)
+            filtered_models = self.model_filter.filter(models, manufacturer)
             
             if filtered_models:
                 logger.info(f"Found {len(filtered_models)} models for {manufacturer}")
@@ -468,34 +571,41 @@ class ModelYearScraper:
             await self.capture_debug_info(page, f"{manufacturer}_get_models_error")
             return []
 
-    async def select_model(self, page, model):
+    async def select_model(self, page, model, manufacturer=None):
         """Select a model from the list."""
         try:
             logger.info(f"Selecting model: {model}")
+            plan = self.navigation_plan(manufacturer)
             
             # First, check if we're already in a table view with models visible
-            is_table_view = await page.evaluate("""(modelName) => {
-                // Check if there's a table or list of models visible
-                const tableElements = document.querySelectorAll('table td, div.model-list li, .model-column li');
+            layout_cached = plan.model_layout is not None
+            if layout_cached:
+                is_table_view = plan.model_layout == TABLE
+            else:
+                is_table_view = await page.evaluate("""(modelName) => {
+                    // Check if there's a table or list of models visible
+                    const tableElements = document.querySelectorAll('table td, div.model-list li, .model-column li');
                 
-                if (tableElements.length > 0) {
-                    // For MINI, find the second instance since the first is the manufacturer
-                    if (modelName === 'MINI') {
-                        const miniElements = Array.from(tableElements)
-                            .filter(el => el.textContent.trim() === modelName);
-                        return miniElements.length >= 2;  // We need at least 2 MINI elements
-                    }
+                    if (tableElements.length > 0) {
+                        // For MINI, find the second instance since the first is the manufacturer
+                        if (modelName === 'MINI') {
+                            const miniElements = Array.from(tableElements)
+                                .filter(el => el.textContent.trim() === modelName);
+                            return miniElements.length >= 2;  // We need at least 2 MINI elements
+                        }
                     
-                    // For other manufacturers, look for exact match
-                    for (const el of tableElements) {
-                        if (el.textContent.trim() === modelName) {
-                            return true;
+                        // For other manufacturers, look for exact match
+                        for (const el of tableElements) {
+                            if (el.textContent.trim() === modelName) {
+                                return true;
+                            }
                         }
                     }
-                }
                 
-                return false;
-            }""", model)
+                    return false;
+                }""", model)
+                if is_table_view:
+                    self.learn_layout(manufacturer, "model", TABLE)
             
             logger.info(f"Is table view with models: {is_table_view}")
             
@@ -504,7 +614,7 @@ class ModelYearScraper:
                 logger.info("Using table view mode to select model")
                 
                 # For MINI, use specific handling to click the second instance
-                if model == 'MINI':
+                if model in plan.duplicate_models:
                     clicked = await page.evaluate("""() => {
                         const miniElements = Array.from(document.querySelectorAll('table td, div.model-list li, .model-column li'))
                             .filter(el => el.textContent.trim() === 'MINI' && 
@@ -523,6 +633,9 @@ class ModelYearScraper:
                         logger.info("Successfully clicked MINI model")
                         await page.wait_for_timeout(2000)
                         return True
+                    elif layout_cached:
+                        self.forget_layout(manufacturer, "model")
+                        return await self.select_model(page, model, manufacturer)
                     else:
                         logger.warning("Could not find MINI model to click")
                     return False
@@ -538,7 +651,7 @@ class ModelYearScraper:
                 ]
                 
                 clicked = False
-                for selector in selectors:
+                for selector in self.selector_cache.order(manufacturer, "model", selectors, model):
                     try:
                         logger.info(f"Trying to click model with selector: {selector}")
                         # Only wait 1 second for each selector to avoid long timeouts
@@ -546,44 +659,23 @@ class ModelYearScraper:
                         if await element.count() > 0:
                             await element.click()
                             logger.info(f"Successfully clicked model {model} in table view")
+                            self.selector_cache.record(manufacturer, "model", selector, True, model)
                             clicked = True
                             break
                     except Exception as e:
                         logger.debug(f"Selector {selector} failed: {e}")
+                    self.selector_cache.record(manufacturer, "model", selector, False, model)
                 
                 if not clicked:
                     # Try JavaScript click as a last resort
                     logger.info("Trying JavaScript click on model")
-                    clicked = await page.evaluate("""(modelName) => {
-                        // For MINI, find the first model element that's not a manufacturer
-                        if (modelName === 'MINI') {
-                            const elements = Array.from(document.querySelectorAll('li'))
-                                .filter(el => 
-                                    el.textContent.trim() === modelName && 
-                                    !el.closest('.manufacturer') &&
-                                    !el.closest('.make-list')
-                                );
-                            
-                            if (elements.length > 0) {
-                                elements[0].click();
-                                return true;
-                            }
-                            return false;
-                        }
-                        
-                        // For other manufacturers, find exact match
-                        const elements = Array.from(document.querySelectorAll('*'))
-                            .filter(el => el.textContent.trim() === modelName);
-                            
-                        if (elements.length > 0) {
-                            elements[0].click();
-                            return true;
-                        }
-                        return false;
-                    }""", model)
+                    clicked = await click_menu_item(page, model, last=model in plan.duplicate_models)
                     
                     if clicked:
                         logger.info(f"Successfully clicked model {model} with JavaScript")
+                    elif layout_cached:
+                        self.forget_layout(manufacturer, "model")
+                        return await self.select_model(page, model, manufacturer)
                     else:
                         logger.warning(f"Could not click model {model} in table view")
                         
@@ -614,10 +706,7 @@ class ModelYearScraper:
                         await self.capture_debug_info(page, f"model_selection_visible_elements_{manufacturer}_{model}")
                         
                         # Also try to check if the model we want exists on the page at all
-                        model_exists = await page.evaluate("""(modelName) => {
-                            return Array.from(document.querySelectorAll('*'))
-                                .some(el => el.textContent.trim() === modelName);
-                        }""", model)
+                        model_exists = await find_menu_item(page, model, visible_only=False) > 0
                         logger.info(f"Model '{model}' exists somewhere on the page: {model_exists}")
                         
                         if not model_exists:
@@ -648,9 +737,10 @@ class ModelYearScraper:
             
             # Wait for the element to be visible
             try:
-                await page.wait_for_selector(selector, timeout=5000)
+                await self.wait_for(page, selector, "model_option", 5000)
                 await page.click(selector)
                 logger.info(f"Successfully clicked model {model} in dropdown")
+                self.learn_layout(manufacturer, "model", DROPDOWN)
                 await page.wait_for_timeout(2000)  # Wait for Year/Chassis panel to appear
                 return True
             except Exception as e:
@@ -708,13 +798,15 @@ class ModelYearScraper:
         try:
             logger.info(f"Getting years/chassis for {manufacturer} - {model}")
             
+            plan = self.navigation_plan(manufacturer)
+
             # Check if this is a special Lexus model that uses model codes
-            if manufacturer == 'LEXUS' and model in self.MODEL_CODE_MODELS['LEXUS']:
+            if model in plan.model_code_models:
                 logger.info(f"Special Lexus model {model} detected - looking for model code instead of year")
                 try:
                     # Click the Year/System dropdown as we still need to open it
                     year_system_selector = "input[placeholder='Year/System']"
-                    year_system_element = await page.wait_for_selector(year_system_selector, timeout=5000)
+                    year_system_element = await self.wait_for(page, year_system_selector, "year_menu", 5000)
                     if year_system_element:
                         await year_system_element.click()
                         logger.info("Clicked Year/System dropdown")
@@ -744,11 +836,11 @@ class ModelYearScraper:
                 return []
             
             # For Toyota and Lexus, we need to click the Year/System dropdown first
-            if manufacturer in {'TOYOTA', 'LEXUS'}:
+            if plan.open_year_menu:
                 try:
                     # Click the Year/System dropdown
                     year_system_selector = "input[placeholder='Year/System']"
-                    year_system_element = await page.wait_for_selector(year_system_selector, timeout=5000)
+                    year_system_element = await self.wait_for(page, year_system_selector, "year_menu", 5000)
                     if year_system_element:
                         await year_system_element.click()
                         logger.info("Clicked Year/System dropdown")
@@ -925,26 +1017,20 @@ class ModelYearScraper:
             await self.capture_debug_info(page, f"{manufacturer}_{model}_get_years_error")
             return []
 
-    async def interact_with_dropdown(self, page, identifying_text, option_text, need_to_open=True):
+    async def interact_with_dropdown(self, page, identifying_text, option_text, need_to_open=True, manufacturer=None):
         """Interact with a dropdown element."""
         try:
             logger.info(f"Interacting with dropdown: '{identifying_text}' to select '{option_text}'")
             
             # Special handling for Kia, Hyundai, and Genesis engine selection
             if identifying_text == "System" and option_text in ["ACC", "LDW"]:
-                # Check if we're dealing with Kia, Hyundai, or Genesis
-                current_make = await page.evaluate("""() => {
-                    const makeInput = document.querySelector("input[placeholder='Make/Model/Year']");
-                    return makeInput ? makeInput.value : '';
-                }""")
-                
-                if current_make in ["Kia", "Hyundai", "Genesis"]:
-                    logger.info(f"Special handling for {current_make} engine selection")
+                if self.navigation_plan(manufacturer).engine_step:
+                    logger.info(f"Special handling for {manufacturer} engine selection")
                     
                     # Look for the Engine/vehicle configuration/System field
                     engine_selector = "input[placeholder='Engine/vehicle configuration/System']"
                     try:
-                        engine_field = await page.wait_for_selector(engine_selector, timeout=2000)
+                        engine_field = await self.wait_for(page, engine_selector, "engine_field", 2000)
                         if engine_field:
                             logger.info("Found Engine/vehicle configuration/System field")
                             await engine_field.click()
@@ -996,7 +1082,7 @@ class ModelYearScraper:
             
             # Wait for and click the dropdown toggle
             dropdown_selector = f"input[placeholder='{identifying_text}']"
-            dropdown = await page.wait_for_selector(dropdown_selector, timeout=10000)
+            dropdown = await self.wait_for(page, dropdown_selector, "dropdown_input", 10000)
             
             if need_to_open:
                 await dropdown.click()
@@ -1005,7 +1091,8 @@ class ModelYearScraper:
             # First, wait for the dropdown list to be visible
             try:
                 # Wait for any dropdown list container to appear
-                await page.wait_for_selector("ul:visible, .dropbox ul:visible, .dropdown ul:visible", timeout=5000)
+                await self.wait_for(page, "ul:visible, .dropbox ul:visible, .dropdown ul:visible", "dropdown_list", 5000,
+                                    expected=False)
 
             except Exception as e:
                 logger.error(f"Could not find visible dropdown list: {e}")
@@ -1017,47 +1104,50 @@ class ModelYearScraper:
                 f"//div[contains(@class, 'dropbox')]//li[contains(text(), '{option_text}')]"  # Backup selector
             ]
             
-            option_found = False
-            for selector in selectors:
-                try:
+            async def is_exact_option(element):
+                # Verify this is the correct element before clicking
+                element_info = await page.evaluate("""(element) => {
+                    return {
+                        tagName: element.tagName,
+                        textContent: element.textContent.trim(),
+                        className: element.className,
+                        id: element.id,
+                        isVisible: element.offsetParent !== null,
+                        parentElement: {
+                            tagName: element.parentElement ? element.parentElement.tagName : '',
+                            className: element.parentElement ? element.parentElement.className : '',
+                            id: element.parentElement ? element.parentElement.id : ''
+                        }
+                    }
+                }""", element)
 
-                    element = await page.wait_for_selector(selector, timeout=2000)
-                    if element:
-                        # Verify this is the correct element before clicking
-                        element_info = await page.evaluate("""(element) => {
-                            return {
-                                tagName: element.tagName,
-                                textContent: element.textContent.trim(),
-                                className: element.className,
-                                id: element.id,
-                                isVisible: element.offsetParent !== null,
-                                parentElement: {
-                                    tagName: element.parentElement ? element.parentElement.tagName : '',
-                                    className: element.parentElement ? element.parentElement.className : '',
-                                    id: element.parentElement ? element.parentElement.id : ''
-                                }
-                            }
-                        }""", element)
-                        
-                        # Only proceed if this is actually a list item with the exact text we want
-                        if (element_info['tagName'] == 'LI' and 
-                            element_info['textContent'] == option_text and 
-                            element_info['isVisible']):
+                # Only accept an actual, visible list item with exactly the text we want
+                if (element_info['tagName'] == 'LI' and
+                        element_info['textContent'] == option_text and
+                        element_info['isVisible']):
+                    return True
+                logger.info(f"Found element but it doesn't match our criteria: {element_info}")
+                return False
+
+            # Race the candidates, so a wrong first choice costs one timeout instead of three
+            step = f"dropdown:{identifying_text}"
+            selectors = self.selector_cache.order(manufacturer, step, selectors, option_text)
+            host = urlparse(page.url).netloc or None
+            timeout, _ = self.step_timeout("dropdown_option", 2000, host)
+            start = time.monotonic()
+            index, element, misses = await race_selectors(page, selectors, timeout=timeout, accept=is_exact_option)
+            for miss in misses:
+                self.selector_cache.record(manufacturer, step, selectors[miss], False, option_text)
+
+            option_found = False
+            if element:
+                self.timeouts.record("dropdown_option", (time.monotonic() - start) * 1000, host)
+                # Ensure element is in view and click it
+                await element.scroll_into_view_if_needed()
+                await element.click()
+                self.selector_cache.record(manufacturer, step, selectors[index], True, option_text)
+                option_found = True
 
-                            
-                            # Ensure element is in view and click it
-                            await element.scroll_into_view_if_needed()
-                            await element.click()
-                            option_found = True
-                            break
-                        else:
-                            logger.info(f"Found element but it doesn't match our criteria: {element_info}")
-                            continue
-                            
-                except Exception as e:
-                    logger.debug(f"Selector {selector} failed: {e}")
-                    continue
-            
             if not option_found:
                 # If no selector worked, try to get all visible text to help debug
                 visible_text = await page.evaluate("""() => {
@@ -1087,6 +1177,32 @@ class ModelYearScraper:
             await self.capture_debug_info(page, f"dropdown_error_{identifying_text}")
             return False
 
+    async def get_system_options(self, page, manufacturer):
+        """List the system names offered for the selected year/chassis."""
+        try:
+            # Options are already open after the vehicle configuration step (Audi, VW)
+            vehicle_config = self.navigation_plan(manufacturer).vehicle_config
+            if not vehicle_config:
+                await page.click("input[placeholder='System']")
+                await page.wait_for_timeout(1000)
+
+            options = await page.evaluate("""() => {
+                return Array.from(document.querySelectorAll('li'))
+                    .filter(el => el.offsetParent !== null)
+                    .map(el => el.textContent.trim())
+                    .filter(text => text.length > 0);
+            }""")
+
+            if not vehicle_config:
+                # Press escape to close the dropdown
+                await page.keyboard.press("Escape")
+                await page.wait_for_timeout(500)
+
+            return options
+        except Exception as e:
+            logger.warning(f"Could not read system options: {e}")
+            return []
+
     async def process_adas_systems(self, page, manufacturer, model, year_or_chassis):
         """Process ADAS systems for a specific year/model/chassis combination."""
         try:
@@ -1138,8 +1254,10 @@ class ModelYearScraper:
             mappings = self.system_mappings[make_key]
             logger.info(f"Found system mappings for {make_key}: {mappings}")
             
+            plan = self.navigation_plan(manufacturer)
+
             # For Audi/VW, check if system options are already visible
-            if manufacturer in {'AUDI', 'VOLKSWAGEN'}:
+            if plan.vehicle_config:
                 # Process each system type
                 for system_type, system_options in mappings.items():
                     # For each system type after the first one, we need to re-click the field
@@ -1147,7 +1265,7 @@ class ModelYearScraper:
                         # Click the Engine/vehicle configuration field to reveal options
                         engine_config_selector = "input[placeholder='Engine/vehicle configuration/System']"
                         try:
-                            engine_config_element = await page.wait_for_selector(engine_config_selector, timeout=2000)
+                            engine_config_element = await self.wait_for(page, engine_config_selector, "engine_config_field", 2000)
                             if engine_config_element:
                                 logger.info("Re-clicking Engine/vehicle configuration field for next system")
                                 await engine_config_element.click()
@@ -1171,6 +1289,7 @@ class ModelYearScraper:
                             
                             # Click the visible option
                             try:
+                                panel_before = await self.get_panel_hash(page)
                                 await page.evaluate(f"""(system) => {{
                                     const elements = Array.from(document.querySelectorAll('li'));
                                     const targetElement = elements.find(el => 
@@ -1184,23 +1303,9 @@ class ModelYearScraper:
                                 await page.wait_for_timeout(2000)  # Wait for any animations/changes
                                 
                                 # Get calibration type and CSC code
-                                calibration_type = await self.get_calibration_type(page)
-                                if calibration_type:
-                                    logger.info(f"Detected calibration type: {calibration_type}")
-                                    
-                                    # If static is in the calibration type, try to get CSC model
-                                    if "Static" in calibration_type:
-                                        # Look for CSC model in the page
-                                        csc_model = await self.get_csc_code(page)
-                                        if csc_model:
-                                            logger.info(f"Found CSC model: {csc_model}")
-                                            adas_results[system_type] = csc_model
-                                        else:
-                                            logger.info("No CSC model found, returning calibration type")
-                                            adas_results[system_type] = calibration_type
-                                    else:
-                                        # For dynamic, just return the calibration type
-                                        adas_results[system_type] = calibration_type
+                                adas_value = await self.get_adas_value(page, previous_hash=panel_before)
+                                if adas_value:
+                                    adas_results[system_type] = adas_value
                                     
                                     # Break inner loop once we've found and processed a matching option
                                     break
@@ -1250,11 +1355,11 @@ class ModelYearScraper:
                         logger.info(f"Processing system type: {system_type} with option: {system_option}")
                         
                         # Only re-click System field for manufacturers that close their dropdowns
-                        if manufacturer in {'BMW', 'AUDI', 'VOLKSWAGEN'} and option_index > 0:
+                        if plan.reopen_system_menu and option_index > 0:
                             # Re-click System field to open dropdown again
                             system_selector = "input[placeholder='System']"
                             try:
-                                system_element = await page.wait_for_selector(system_selector, timeout=2000)
+                                system_element = await self.wait_for(page, system_selector, "system_field", 2000)
                                 if system_element:
                                     logger.info("Re-clicking System field for next option")
                                     await system_element.click()
@@ -1264,6 +1369,7 @@ class ModelYearScraper:
                                 continue
                         
                         # Use our improved select_system method
+                        panel_before = await self.get_panel_hash(page)
                         if await self.select_system(page, system_option):
                             logger.info(f"Successfully selected system: {system_option}")
                             
@@ -1274,30 +1380,9 @@ class ModelYearScraper:
                             await page.screenshot(path=f"debug_info/after_select_{system_option}.png")
                             
                             # Look for calibration type indicators with retries
-                            calibration_type = None
-                            for attempt in range(3):  # Try up to 3 times
-                                calibration_type = await self.get_calibration_type(page)
-                                if calibration_type:
-                                    break
-                                logger.info(f"Calibration type not found, retry {attempt+1}/3")
-                                await page.wait_for_timeout(1000)  # Wait a bit between retries
-                            
-                            if calibration_type:
-                                logger.info(f"Detected calibration type: {calibration_type}")
-                                
-                                # If static is in the calibration type, try to get CSC model
-                                if "Static" in calibration_type:
-                                    # Look for CSC model in the page
-                                    csc_model = await self.get_csc_code(page)
-                                    if csc_model:
-                                        logger.info(f"Found CSC model: {csc_model}")
-                                        adas_results[system_type] = csc_model
-                                    else:
-                                        logger.info("No CSC model found, returning calibration type")
-                                        adas_results[system_type] = calibration_type
-                                else:
-                                    # For dynamic, just return the calibration type
-                                    adas_results[system_type] = calibration_type
+                            adas_value = await self.get_adas_value(page, attempts=3, previous_hash=panel_before)
+                            if adas_value:
+                                adas_results[system_type] = adas_value
                                 
                                 # Break the loop for this system type once we've found a valid result
                                 break
@@ -1322,259 +1407,516 @@ class ModelYearScraper:
             
             return adas_results
 
-    async def process_manufacturer(self, manufacturer):
-        """Process all models and years for a specific manufacturer."""
-        logger.info(f"===== Processing Manufacturer: {manufacturer} =====")
-        
+    @asynccontextmanager
+    async def browser_session(self):
+        """Launch a browser and context for a batch of tasks and clean them up afterwards."""
+        async with async_playwright() as p:
+            self.browser = await p.chromium.launch(headless=self.headless)
+            self.context = await self.browser.new_context()
+            # Menu item index used for text lookups on every page (menu_index.py)
+            await self.context.add_init_script(MENU_INDEX_SCRIPT)
+            try:
+                yield self.context
+            finally:
+                if self.context:
+                    await self.context.close()
+                if self.browser:
+                    await self.browser.close()
+                self.page = None
+                self.context = None
+                self.browser = None
+
+    async def open_coverage_page(self, website_make):
+        """Open a fresh coverage page with the product type and make selected."""
+        page = await self.context.new_page()
         try:
-            # Check if we already have results for this manufacturer
-            results_file = os.path.join(self.results_dir, f"{manufacturer}_results.json")
-            existing_results = {}
-            if os.path.exists(results_file):
+            try:
+                await self.rate_limiter.acquire(self.coverage_url)
+                load_start = time.monotonic()
+                await page.goto(self.coverage_url)
+                # Wait for page to be fully loaded
+                await page.wait_for_load_state("networkidle")
+                self.concurrency.record_load_time(time.monotonic() - load_start)
+            except Exception as e:
+                raise NavigationError(f"Failed to load {self.coverage_url}: {e}") from e
+
+            if not await self.interact_with_dropdown(page, "Product type", "MA600", True):
+                raise SelectorNotFoundError("Failed to select product type MA600")
+
+            if not await self.select_make(page, website_make):
+                raise SelectorNotFoundError(f"Failed to select make: {website_make}")
+
+            return page
+        except Exception:
+            await page.close()
+            raise
+
+    def load_existing_results(self, manufacturer):
+        """Load previously saved results for a manufacturer, if any."""
+        results_file = os.path.join(self.results_dir, f"{manufacturer}_results.json")
+        if not os.path.exists(results_file):
+            return {}
+        try:
+            with open(results_file, 'r', encoding='utf-8') as f:
+                existing_data = json.load(f)
+            if manufacturer in existing_data:
+                logger.info(f"Found existing results for {manufacturer}")
+                return existing_data[manufacturer]
+        except Exception as e:
+            logger.warning(f"Error reading existing results for {manufacturer}: {e}")
+        return {}
+
+    def get_ymm_record(self, manufacturer, model, year_or_chassis):
+        """Return the stored record for a YMM, or None if it has never been stored."""
+        return self.results.get(manufacturer, {}).get("models", {}).get(model, {}).get(year_or_chassis)
+
+    def needs_refresh(self, manufacturer, model, year_or_chassis):
+        """Check whether a YMM is missing ADAS data, past its TTL or failed last time."""
+        return self.scheduler.is_due(manufacturer, self.get_ymm_record(manufacturer, model, year_or_chassis))
+
+    def menu_changed_since_scrape(self, manufacturer, model, year_or_chassis, record):
+        """True if the catalog saw this YMM's system menu change after its calibration data was scraped."""
+        changed_at = self.catalog.changed_at(manufacturer, model, year_or_chassis)
+        if not changed_at:
+            return False
+        last_scraped = (record or {}).get("last_scraped")
+        return not last_scraped or changed_at > last_scraped
+
+    def model_changed_since_visit(self, manufacturer, model, record):
+        """True if the model's year list changed after this YMM was last scraped or checked."""
+        changed_at = self.catalog.changed_at(manufacturer, model)
+        if not changed_at:
+            return False
+        visits = [t for t in ((record or {}).get("last_scraped"), (record or {}).get("last_checked")) if t]
+        return not visits or changed_at > max(visits)
+
+    def out_of_time(self):
+        """True once the run's time budget is spent."""
+        return self.run_deadline is not None and time.monotonic() >= self.run_deadline
+
+    def get_data_type(self, manufacturer):
+        """Key under which a manufacturer's years/chassis list is stored."""
+        if manufacturer in self.CHASSIS_BASED_MANUFACTURERS:
+            return "chassis"
+        if manufacturer in self.MODEL_DESIGNATION_MANUFACTURERS:
+            return "model_designation"
+        return "year"
+
+    async def discover_model(self, task):
+        """Get the years/chassis for a model and return the YMM tasks to scrape."""
+        manufacturer, model = task.manufacturer, task.model
+        model_page = await self.open_coverage_page(task.website_make)
+        try:
+            if not await self.select_model(model_page, model, manufacturer):
+                raise SelectorNotFoundError(f"Failed to select model: {model}")
+
+            years_or_chassis = await self.get_years_or_chassis(model_page, manufacturer, model)
+
+            years_changed = False
+            if years_or_chassis:
+                key = model_menu_key(manufacturer, model)
+                known = self.fingerprints.seen_before(key)
+                years_changed = self.fingerprints.update(key, years_or_chassis) and known
+            self.catalog.set_years(manufacturer, model, years_or_chassis, changed=years_changed)
+
+            # Store in results
+            data_type = self.get_data_type(manufacturer)
+            models = self.results[manufacturer]["models"]
+            if model not in models:
+                models[model] = {data_type: years_or_chassis}
+            else:
+                # Update with latest data
+                models[model][data_type] = years_or_chassis
+
+            # Skip if manufacturer doesn't use years, as we can't select anything else
+            if manufacturer in self.NO_YEAR_MANUFACTURERS or not years_or_chassis:
+                logger.info(f"Skipping {manufacturer} {model} - No years/chassis to process")
+                return []
+
+            logger.info(f"Processing {len(years_or_chassis)} {data_type} for model {model}")
+
+            if task.catalog_only:
+                return await self.catalog_model_years(model_page, task, years_or_chassis)
+        finally:
+            await model_page.close()
+
+        # Descend only into YMMs that are due, or whose menus changed since they were last visited
+        tasks = []
+        for year_or_chassis in years_or_chassis:
+            record = self.get_ymm_record(manufacturer, model, year_or_chassis)
+            if not (self.needs_refresh(manufacturer, model, year_or_chassis) or
+                    self.model_changed_since_visit(manufacturer, model, record) or
+                    self.menu_changed_since_scrape(manufacturer, model, year_or_chassis, record)):
+                logger.info(f"Skipping {year_or_chassis} - ADAS data is fresh and its menus are unchanged")
+                continue
+            tasks.append(ScrapeTask(manufacturer, task.website_make, model, year_or_chassis,
+                                    priority=self.scheduler.priority(manufacturer, year_or_chassis, record)))
+        return tasks
+
+    async def scrape_ymm(self, task):
+        """Scrape the ADAS calibration data for a single YMM."""
+        manufacturer, model, year_or_chassis = task.manufacturer, task.model, task.year_or_chassis
+        started = time.monotonic()
+
+        # Create a new page for each year to ensure a clean state
+        year_page = await self.open_coverage_page(task.website_make)
+        try:
+            if not await self.select_model(year_page, model, manufacturer):
+                raise SelectorNotFoundError(f"Failed to select model for {year_or_chassis}")
+
+            if not await self.select_year_or_chassis(year_page, year_or_chassis, manufacturer, model):
+                raise SelectorNotFoundError(f"Failed to select {year_or_chassis}")
+
+            # Only re-run calibration scraping when the system menu differs from the last run
+            systems = await self.get_system_options(year_page, manufacturer)
+            systems_changed = (not systems or
+                               self.fingerprints.update(ymm_menu_key(manufacturer, model, year_or_chassis), systems))
+            if systems:
+                self.catalog.set_systems(manufacturer, model, year_or_chassis, systems)
+            record = self.get_ymm_record(manufacturer, model, year_or_chassis)
+            # The catalog phase may already have recorded a change this run's fingerprint can't see
+            if (not systems_changed and not self.full_refresh and
+                    not self.menu_changed_since_scrape(manufacturer, model, year_or_chassis, record) and
+                    self.scheduler.has_data(record) and not self.scheduler.failed_last_time(record)):
+                logger.info(f"System menu unchanged for {model} {year_or_chassis}, skipping calibration")
+                record["last_checked"] = datetime.now().isoformat(timespec="seconds")
+                self.save_results(manufacturer)
+                return []
+
+            adas_results = await self.process_adas_systems(year_page, manufacturer, model, year_or_chassis)
+        finally:
+            await year_page.close()
+
+        # Store ADAS results
+        adas_results["last_scraped"] = datetime.now().isoformat(timespec="seconds")
+        model_data = self.results[manufacturer]["models"][model]
+        if year_or_chassis not in model_data:
+            model_data[year_or_chassis] = adas_results
+        else:
+            # Update with ADAS data
+            model_data[year_or_chassis].update(adas_results)
+            model_data[year_or_chassis].pop("last_failed", None)
+
+        logger.info(f"Stored ADAS results for {model} {year_or_chassis}")
+
+        # Save after each YMM for incremental progress
+        self.save_results(manufacturer)
+        logger.info(f"Saved incremental results for {manufacturer} after {model} {year_or_chassis}")
+        self.ymm_durations.append(time.monotonic() - started)
+        return []
+
+    async def catalog_ymm(self, task):
+        """Record the system names offered for a YMM without scraping calibration data."""
+        manufacturer, model, year_or_chassis = task.manufacturer, task.model, task.year_or_chassis
+
+        year_page = await self.open_coverage_page(task.website_make)
+        try:
+            if not await self.select_model(year_page, model, manufacturer):
+                raise SelectorNotFoundError(f"Failed to select model for {year_or_chassis}")
+
+            if not await self.select_year_or_chassis(year_page, year_or_chassis, manufacturer, model):
+                raise SelectorNotFoundError(f"Failed to select {year_or_chassis}")
+
+            systems = await self.get_system_options(year_page, manufacturer)
+        finally:
+            await year_page.close()
+
+        self.record_systems(manufacturer, model, year_or_chassis, systems)
+        return []
+
+    async def catalog_model_years(self, page, task, years_or_chassis):
+        """Catalog a model's years on the page it was discovered on and return catalog tasks for any left over.
+
+        Each year is reached by reselecting make, model and year on the same
+        page, which saves a page load and the product type step per YMM. The
+        year that fails, and every year after it, is handed back as its own
+        catalog task, as are the years the attempt's budget may not cover.
+        """
+        manufacturer, model = task.manufacturer, task.model
+        slowest = 0.0
+        for index, year_or_chassis in enumerate(years_or_chassis):
+            remaining = self.remaining_budget()
+            if remaining is not None and remaining < 2 * slowest:
+                logger.info(f"{remaining:.0f}s left of the budget for {model}, handing off the remaining years")
+                break
+            started = time.monotonic()
+            try:
+                if not (await self.select_make(page, task.website_make) and
+                        await self.select_model(page, model, manufacturer) and
+                        await self.select_year_or_chassis(page, year_or_chassis, manufacturer, model)):
+                    logger.warning(f"Could not reselect {model} {year_or_chassis} on the model page")
+                    break
+                systems = await self.get_system_options(page, manufacturer)
+            except Exception as e:
+                logger.warning(f"Cataloguing {model} {year_or_chassis} on the model page failed: {e}")
+                break
+            self.record_systems(manufacturer, model, year_or_chassis, systems)
+            slowest = max(slowest, time.monotonic() - started)
+        else:
+            return []
+
+        leftovers = years_or_chassis[index:]
+        logger.info(f"Queueing {len(leftovers)} years of {model} as separate catalog tasks")
+        return [ScrapeTask(manufacturer, task.website_make, model, year_or_chassis,
+                           priority=task.priority, catalog_only=True)
+                for year_or_chassis in leftovers]
+
+    def record_systems(self, manufacturer, model, year_or_chassis, systems):
+        """Store a YMM's system names in the catalog, marking a menu that changed since the last run."""
+        changed = False
+        if systems:
+            key = ymm_menu_key(manufacturer, model, year_or_chassis)
+            known = self.fingerprints.seen_before(key)
+            # Only a menu that differs from a previous run counts; first sightings are new, not changed
+            changed = self.fingerprints.update(key, systems) and known
+        self.catalog.set_systems(manufacturer, model, year_or_chassis, systems, changed=changed)
+        logger.info(f"Catalogued {len(systems)} systems for {model} {year_or_chassis}")
+
+    async def run_tasks(self, tasks):
+        """Run discovery and YMM tasks on parallel page workers, highest priority first."""
+        queue = asyncio.PriorityQueue()
+        order = itertools.count()
+        for task in tasks:
+            queue.put_nowait((-task.priority, next(order), task))
+
+        async def worker():
+            while True:
+                _, _, task = await queue.get()
                 try:
-                    with open(results_file, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                        if manufacturer in existing_data:
-                            existing_results = existing_data[manufacturer]
-                            logger.info(f"Found existing results for {manufacturer}")
+                    for new_task in await self.run_task(task):
+                        queue.put_nowait((-new_task.priority, next(order), new_task))
                 except Exception as e:
-                    logger.warning(f"Error reading existing results for {manufacturer}: {e}")
-            
+                    logger.error(f"Unexpected error running {task}: {e}")
+                    self.requeue_task(task, classify_error(e))
+                finally:
+                    queue.task_done()
+
+        # The controller decides how many of these workers may hold a page at once
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency.max_workers)]
+        try:
+            await queue.join()
+        finally:
+            for worker_task in workers:
+                worker_task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run_task(self, task):
+        """Run a single task with retries and return any tasks it discovered."""
+        if self.out_of_time():
+            logger.info(f"Time budget spent, leaving {task} for the next run")
+            self.deferred_tasks += 1
+            return []
+
+        if task.is_discovery:
+            operation = self.discover_model
+        elif task.catalog_only:
+            operation = self.catalog_ymm
+        else:
+            operation = self.scrape_ymm
+        try:
+            return await self.retry_policy.run(
+                lambda: self.attempt_task(operation, task), task, self.circuit_breaker
+            )
+        except (ScrapeError, DeadlineExceededError) as e:
+            self.requeue_task(task, e)
+            return []
+
+    async def attempt_task(self, operation, task):
+        """Make one attempt at a task inside a concurrency slot and report the outcome."""
+        async with self.concurrency.slot():
+            try:
+                result = await self.run_with_deadline(operation, task)
+            except (Exception, DeadlineExceededError) as e:
+                await self.concurrency.record_result(error=True,
+                                                     timed_out=classify_error(e).kind in ("timeout", "deadline"))
+                raise
+        await self.concurrency.record_result()
+        return result
+
+    async def run_with_deadline(self, operation, task):
+        """Run one attempt at a task, cancelling it once `ymm_budget` seconds have passed.
+
+        Model discoveries get the same budget as YMMs. Every wait, evaluate
+        and OCR call of the attempt is cancelled at the deadline; `wait_for`
+        and OCR also cap their own timeouts to what is left. An overrun
+        raises DeadlineExceededError, which re-queues the task.
+        """
+        if not self.ymm_budget:
+            return await operation(task)
+
+        task.deadline = time.monotonic() + self.ymm_budget
+        token = current_deadline.set(task.deadline)
+        timeout = asyncio.timeout(self.ymm_budget)
+        try:
+            async with timeout:
+                return await operation(task)
+        except TimeoutError as e:
+            if not timeout.expired():
+                raise
+            self.deadline_overruns += 1
+            raise DeadlineExceededError(f"{task} ran past its {self.ymm_budget:g}s budget") from e
+        finally:
+            current_deadline.reset(token)
+            task.deadline = None
+
+    def requeue_task(self, task, error):
+        """Put a failed task back on the retry queue, or give up once its budget is spent."""
+        if isinstance(error, CircuitOpenError) or self.retry_policy.has_budget(task):
+            logger.warning(f"Re-queueing {task} after {error.kind}: {error}")
+            self.retry_queue.append(task)
+        else:
+            logger.error(f"Giving up on {task} after {task.attempts} attempts: {error}")
+            self.failed_tasks.append(task)
+            self.mark_failed(task)
+
+    def mark_failed(self, task):
+        """Stamp a YMM that could not be scraped so the next run prioritises it."""
+        if task.is_discovery:
+            return
+        model_data = self.results.get(task.manufacturer, {}).get("models", {}).get(task.model)
+        if model_data is not None:
+            record = model_data.setdefault(task.year_or_chassis, {})
+            record["last_failed"] = datetime.now().isoformat(timespec="seconds")
+
+    async def process_retry_queue(self):
+        """Retry re-queued tasks once the other manufacturers have been processed."""
+        for retry_pass in range(1, self.MAX_RETRY_PASSES + 1):
+            if not self.retry_queue or self.out_of_time():
+                break
+
+            tasks, self.retry_queue = self.retry_queue, []
+            logger.info(f"===== Retry pass {retry_pass}: {len(tasks)} re-queued tasks =====")
+
+            by_manufacturer = {}
+            for task in tasks:
+                by_manufacturer.setdefault(task.manufacturer, []).append(task)
+
+            # Start with the manufacturers whose circuits close soonest
+            for manufacturer in sorted(by_manufacturer, key=self.circuit_breaker.remaining_cooldown):
+                wait = self.circuit_breaker.remaining_cooldown(manufacturer)
+                if wait > 0:
+                    logger.info(f"Waiting {wait:.0f}s for {manufacturer} circuit to close")
+                    await asyncio.sleep(wait)
+
+                self.init_manufacturer_results(manufacturer)
+                try:
+                    async with self.browser_session():
+                        await self.run_tasks(by_manufacturer[manufacturer])
+                except Exception as e:
+                    logger.error(f"Error retrying tasks for {manufacturer}: {e}")
+                    self.retry_queue.extend(t for t in by_manufacturer[manufacturer] if t not in self.retry_queue)
+                self.release_manufacturer(manufacturer)
+
+        if self.retry_queue:
+            self.failed_tasks.extend(self.retry_queue)
+            for manufacturer in {task.manufacturer for task in self.retry_queue}:
+                self.init_manufacturer_results(manufacturer)
+                for task in self.retry_queue:
+                    if task.manufacturer == manufacturer:
+                        self.mark_failed(task)
+                self.release_manufacturer(manufacturer)
+            self.retry_queue = []
+        self.save_failed_tasks()
+
+    def save_failed_tasks(self):
+        """Record tasks that could not be completed so they are visible after the run."""
+        filename = os.path.join(self.results_dir, "failed_tasks.json")
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump([task.to_dict() for task in self.failed_tasks], f, indent=2)
+            if self.failed_tasks:
+                logger.warning(f"{len(self.failed_tasks)} tasks failed, see {filename}")
+        except Exception as e:
+            logger.error(f"Error saving failed tasks: {e}")
+
+    def init_manufacturer_results(self, manufacturer):
+        """Load a manufacturer's results saved by earlier runs, unless already in memory."""
+        if manufacturer in self.results:
+            return
+        existing_results = self.load_existing_results(manufacturer)
+        self.results[manufacturer] = {"models": {}}
+        if existing_results and "models" in existing_results:
+            self.results[manufacturer]["models"].update(existing_results["models"])
+
+    def release_manufacturer(self, manufacturer):
+        """Flush a manufacturer's results to its file and drop them from memory."""
+        if manufacturer in self.results and self.save_results(manufacturer):
+            del self.results[manufacturer]
+
+    async def process_manufacturer(self, manufacturer, catalog_only=False):
+        """Process all models and years for a specific manufacturer.
+
+        With `catalog_only` the menus are walked and recorded in the catalog
+        but no calibration data is scraped.
+        """
+        logger.info(f"===== Processing Manufacturer: {manufacturer} =====")
+        
+        try:
             # Convert manufacturer name to website format
             website_make = self.get_website_make(manufacturer)
             if not website_make:
                 logger.error(f"Unsupported manufacturer: {manufacturer}")
                 return
             
+            async def load_models():
+                page = await self.open_coverage_page(website_make)
+                models = await self.get_available_models(page, manufacturer)
+                if not models:
+                    await page.close()
+                    raise SelectorNotFoundError(f"No models found for {manufacturer}")
+                return page, models
+
             # Launch a new browser for each manufacturer
-            async with async_playwright() as p:
-                # Launch browser
-                self.browser = await p.chromium.launch(headless=False)
-                self.context = await self.browser.new_context()
-                self.page = await self.context.new_page()
-                
+            async with self.browser_session():
+                self.page = None
+                make_task = ScrapeTask(manufacturer, website_make, "")
                 try:
-                    # Navigate to the target URL
-                    await self.page.goto("https://www.maxisysadas.com/getCoverage.jspx")
-                    
-                    # Wait for page to be fully loaded
-                    await self.page.wait_for_load_state("networkidle")
-                    
-                    # Select Product type using the interact_with_dropdown method
-                    if not await self.interact_with_dropdown(self.page, "Product type", "MA600", True):
-                        logger.error("Failed to select product type MA600")
-                        return
-                    
-                    # Select the manufacturer
-                    if not await self.select_make(self.page, website_make):
-                        logger.error(f"Failed to select make: {website_make}")
-                        return
-                    
-                    # Get all available models
-                    models = await self.get_available_models(self.page, manufacturer)
+                    # Opening the make and listing its models is retried like any task,
+                    # and its failures count towards the make's circuit breaker
+                    self.page, models = await self.retry_policy.run(load_models, make_task, self.circuit_breaker)
+                    self.fingerprints.update(make_menu_key(manufacturer), models)
+                    self.catalog.set_models(manufacturer, website_make, models)
                     
                     # Initialize manufacturer data in results, preserving existing data
-                    if manufacturer not in self.results:
-                        self.results[manufacturer] = {"models": {}}
-                    if existing_results and "models" in existing_results:
-                        self.results[manufacturer]["models"].update(existing_results["models"])
+                    self.init_manufacturer_results(manufacturer)
                     
                     logger.info(f"Processing {len(models)} models for {manufacturer}")
                     
-                    # For each model, get years/chassis
-                    for model_index, model in enumerate(models):
-                        # Check if we need to process this model's years
-                        process_years = True
-                        if model in self.results[manufacturer]["models"]:
-                            model_data = self.results[manufacturer]["models"][model]
-                            # If we have years and at least some ADAS data, skip
-                            if (("years" in model_data and model_data["years"]) or 
-                                ("chassis" in model_data and model_data["chassis"]) or
-                                ("model_designation" in model_data and model_data["model_designation"])):
-                                
-                                # Check if all years have ADAS data
-                                years_with_adas = 0
-                                all_years = []
-                                
-                                if "years" in model_data:
-                                    all_years = model_data["years"]
-                                elif "chassis" in model_data:
-                                    all_years = model_data["chassis"]
-                                elif "model_designation" in model_data:
-                                    all_years = model_data["model_designation"]
-                                
-                                for year in all_years:
-                                    if year in model_data and all(key in model_data[year] for key in [
-                                        "adas_blind_spot_monitor", "adas_windshield_camera", 
-                                        "adas_front_radar", "adas_360_camera"
-                                    ]):
-                                        years_with_adas += 1
-                                
-                                if years_with_adas == len(all_years):
-                                    logger.info(f"Skipping model {model} - already have ADAS data for all years")
-                                    process_years = False
-                        
-                        if not process_years:
-                            continue
-                            
-                        logger.info(f"Processing model {model_index+1}/{len(models)}: {model}")
-                        
-                        try:
-                            # Create a new page for each model to ensure a clean state
-                            model_page = await self.context.new_page()
-                            await model_page.goto("https://www.maxisysadas.com/getCoverage.jspx")
-                            await model_page.wait_for_load_state("networkidle")
-                            
-                            # Select Product type again
-                            if not await self.interact_with_dropdown(model_page, "Product type", "MA600", True):
-                                logger.error(f"Failed to select product type MA600 for model {model}")
-                                await model_page.close()
-                                continue
-                            
-                            # Select the manufacturer again
-                            if not await self.select_make(model_page, website_make):
-                                logger.error(f"Failed to select make for model {model}")
-                                await model_page.close()
-                                continue
-                            
-                            # Select the model
-                            if not await self.select_model(model_page, model):
-                                logger.error(f"Failed to select model: {model}")
-                                await model_page.close()
-                                continue
-                            
-                            # Get years or chassis
-                            years_or_chassis = await self.get_years_or_chassis(model_page, manufacturer, model)
-                            
-                            # Determine the data type based on manufacturer
-                            if manufacturer in self.CHASSIS_BASED_MANUFACTURERS:
-                                data_type = "chassis"
-                            elif manufacturer in self.MODEL_DESIGNATION_MANUFACTURERS:
-                                data_type = "model_designation"
-                            else:
-                                data_type = "year"
-                            
-                            # Store in results
-                            if model not in self.results[manufacturer]["models"]:
-                                self.results[manufacturer]["models"][model] = {
-                                    data_type: years_or_chassis
-                                }
-                            else:
-                                # Update with latest data
-                                self.results[manufacturer]["models"][model][data_type] = years_or_chassis
-                            
-                            # Skip if manufacturer doesn't use years, as we can't select anything else
-                            if manufacturer in self.NO_YEAR_MANUFACTURERS or not years_or_chassis:
-                                logger.info(f"Skipping {manufacturer} {model} - No years/chassis to process")
-                                await model_page.close()
-                                continue
-                            
-                            logger.info(f"Processing {len(years_or_chassis)} {data_type} for model {model}")
-                            
-                            # Process each year/chassis
-                            for year_or_chassis in years_or_chassis:
-                                # Check if we already have ADAS data for this year
-                                if (model in self.results[manufacturer]["models"] and 
-                                    year_or_chassis in self.results[manufacturer]["models"][model] and
-                                    all(key in self.results[manufacturer]["models"][model][year_or_chassis] for key in [
-                                        "adas_blind_spot_monitor", "adas_windshield_camera", 
-                                        "adas_front_radar", "adas_360_camera"
-                                    ])):
-                                    logger.info(f"Skipping {year_or_chassis} - already have ADAS data")
-                                    continue
-                                
-                                # Create a new page for each year to ensure a clean state
-                                year_page = await self.context.new_page()
-                                await year_page.goto("https://www.maxisysadas.com/getCoverage.jspx")
-                                await year_page.wait_for_load_state("networkidle")
-                                
-                                try:
-                                    # Select Product type
-                                    if not await self.interact_with_dropdown(year_page, "Product type", "MA600", True):
-                                        logger.error(f"Failed to select product type MA600 for {year_or_chassis}")
-                                        await year_page.close()
-                                        continue
-                                    
-                                    # Select the manufacturer
-                                    if not await self.select_make(year_page, website_make):
-                                        logger.error(f"Failed to select make for {year_or_chassis}")
-                                        await year_page.close()
-                                        continue
-                                    
-                                    # Select the model
-                                    if not await self.select_model(year_page, model):
-                                        logger.error(f"Failed to select model for {year_or_chassis}")
-                                        await year_page.close()
-                                        continue
-                                    
-                                    # Select the year/chassis
-                                    if not await self.select_year_or_chassis(year_page, year_or_chassis, manufacturer, model):
-                                        logger.error(f"Failed to select {year_or_chassis}")
-                                        await year_page.close()
-                                        continue
-                                    
-                                    # Process ADAS systems
-                                    adas_results = await self.process_adas_systems(year_page, manufacturer, model, year_or_chassis)
-                                    
-                                    # Store ADAS results
-                                    if year_or_chassis not in self.results[manufacturer]["models"][model]:
-                                        self.results[manufacturer]["models"][model][year_or_chassis] = adas_results
-                                    else:
-                                        # Update with ADAS data
-                                        self.results[manufacturer]["models"][model][year_or_chassis].update(adas_results)
-                                    
-                                    # If this model has a 'years' array but no direct year entries, add the ADAS data as direct entries
-                                    if "years" in self.results[manufacturer]["models"][model] and year_or_chassis not in self.results[manufacturer]["models"][model]:
-                                        # Check if the year exists in the years array
-                                        if year_or_chassis in self.results[manufacturer]["models"][model]["years"]:
-                                            # Add the ADAS data as a direct entry
-                                            self.results[manufacturer]["models"][model][year_or_chassis] = adas_results
-                                            logger.info(f"Added ADAS data as direct entry for {model} {year_or_chassis}")
-                                    
-                                    logger.info(f"Stored ADAS results for {model} {year_or_chassis}")
-                                    
-                                    # Save after each YMM for incremental progress
-                                    self.save_results(manufacturer)
-                                    logger.info(f"Saved incremental results for {manufacturer} after {model} {year_or_chassis}")
-                                    
-                                except Exception as year_err:
-                                    logger.error(f"Error processing {year_or_chassis}: {year_err}")
-                                finally:
-                                    # Clean up
-                                    await year_page.close()
-                            
-                            # Clean up model page
-                            await model_page.close()
-                            
-                            # Save interim results regularly - we'll keep this as well for redundancy
-                            if model_index % 5 == 0 or model_index == len(models) - 1:
-                                self.save_results(manufacturer)
-                                logger.info(f"Saved interim results for {manufacturer} after model {model}")
-                            
-                        except Exception as model_err:
-                            logger.error(f"Error processing model {model}: {model_err}")
-                            continue
+                    # For each model, re-list its years/chassis; listing is cheap, and
+                    # freshness is decided per YMM once the current list is known
+                    tasks = []
+                    for model in models:
+                        model_data = self.results[manufacturer]["models"].get(model, {})
+                        tasks.append(ScrapeTask(manufacturer, website_make, model,
+                                                priority=self.scheduler.model_priority(manufacturer, model_data),
+                                                catalog_only=catalog_only))
+                    
+                    logger.info(f"Queued {len(tasks)} models for {manufacturer}")
+                    await self.run_tasks(tasks)
                     
                     # Save final results for this manufacturer
                     self.save_results(manufacturer)
+                    self.fingerprints.save()
+                    self.panel_cache.save()
+                    self.selector_cache.save()
+                    self.timeouts.save()
+                    self.catalog.save()
                     logger.info(f"Completed processing {manufacturer}")
-                
+
+                except ScrapeError as e:
+                    logger.error(f"Giving up on listing models for {manufacturer} after {make_task.attempts} attempts: {e}")
+                    self.failed_tasks.append(make_task)
+                    if manufacturer in self.results:
+                        self.save_results(manufacturer)
+
                 except Exception as e:
                     logger.error(f"Error processing manufacturer {manufacturer}: {e}")
-                    await self.capture_debug_info(self.page, f"{manufacturer}_error")
+                    if self.page:
+                        await self.capture_debug_info(self.page, f"{manufacturer}_error")
                     
                     # Save whatever results we have
                     if manufacturer in self.results:
                         self.save_results(manufacturer)
-                
-                finally:
-                    # Clean up
-                    if self.page:
-                        await self.page.close()
-                    if self.context:
-                        await self.context.close()
-                    if self.browser:
-                        await self.browser.close()
         
         except Exception as e:
             logger.error(f"Fatal error processing manufacturer {manufacturer}: {e}")
@@ -1583,40 +1925,195 @@ class ModelYearScraper:
                 self.save_results(manufacturer)
 
     def save_results(self, manufacturer=None):
-        """Save the results to a JSON file."""
+        """Save the results to a JSON file; return True on success.
+
+        Without a manufacturer, all_results.json is rebuilt from the
+        per-manufacturer files one manufacturer at a time, so the whole
+        catalog is never held in memory.
+        """
         try:
             if manufacturer:
                 # Save manufacturer-specific results
                 if manufacturer in self.results:
                     filename = os.path.join(self.results_dir, f"{manufacturer}_results.json")
-                    with open(filename, 'w', encoding='utf-8') as f:
+                    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+                    with open(tmp_filename, 'w', encoding='utf-8') as f:
                         json.dump({manufacturer: self.results[manufacturer]}, f, indent=2)
+                    os.replace(tmp_filename, filename)
                     logger.info(f"Saved results for {manufacturer} to {filename}")
             else:
-                # Save all results
-                filename = os.path.join(self.results_dir, "all_results.json")
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.results, f, indent=2)
-                logger.info(f"Saved all results to {filename}")
+                # Flush anything still in memory, then merge the manufacturer files
+                for manufacturer in list(self.results):
+                    self.release_manufacturer(manufacturer)
+                self.merge_results()
+            return True
         except Exception as e:
             logger.error(f"Error saving results: {e}")
+            return False
 
-    async def run(self):
-        """Run the scraper for all manufacturers."""
-        start_time = time.time()
-        logger.info("Starting Model/Year scraper")
-        
-        # Process each manufacturer
-        for manufacturer in self.MANUFACTURERS:
+    def merge_results(self):
+        """Stream every manufacturer file into all_results.json.
+
+        The output is byte-for-byte what json.dump(..., indent=2) of the
+        combined dict would produce.
+        """
+        filename = os.path.join(self.results_dir, "all_results.json")
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        merged = 0
+        with open(tmp_filename, 'w', encoding='utf-8') as out:
+            out.write("{")
+            for manufacturer in self.MANUFACTURERS:
+                data = self.load_existing_results(manufacturer)
+                if not data:
+                    continue
+                out.write("," if merged else "")
+                # Nest the manufacturer's block one level deeper
+                body = json.dumps(data, indent=2).replace("\n", "\n  ")
+                out.write(f"\n  {json.dumps(manufacturer)}: {body}")
+                merged += 1
+            out.write("\n}" if merged else "}")
+        os.replace(tmp_filename, filename)
+        logger.info(f"Saved all results for {merged} manufacturers to {filename}")
+
+    def plan_calibration(self, manufacturers):
+        """Build the calibrate phase's work list from the catalog: manufacturer -> due YMM tasks.
+
+        A YMM is due when its data is past its TTL, failed last time, its
+        model's year list changed after it was last visited, or its system
+        menu changed in the catalog after it was last scraped.
+        """
+        plan = {}
+        for manufacturer in manufacturers:
+            website_make = self.catalog.website_make(manufacturer)
+            models = self.catalog.models(manufacturer)
+            if not website_make or not models:
+                logger.warning(f"{manufacturer} is not in the catalog, run the catalog phase first")
+                continue
+
+            self.init_manufacturer_results(manufacturer)
+            self.apply_catalog_years(manufacturer)
+            tasks = []
+            for model, years_or_chassis in models.items():
+                for year_or_chassis in years_or_chassis:
+                    record = self.get_ymm_record(manufacturer, model, year_or_chassis)
+                    if not (self.needs_refresh(manufacturer, model, year_or_chassis) or
+                            self.model_changed_since_visit(manufacturer, model, record) or
+                            self.menu_changed_since_scrape(manufacturer, model, year_or_chassis, record)):
+                        continue
+                    tasks.append(ScrapeTask(manufacturer, website_make, model, year_or_chassis,
+                                            priority=self.scheduler.priority(manufacturer, year_or_chassis, record)))
+            if tasks:
+                plan[manufacturer] = tasks
+            # Planning only reads the results; they are loaded again when calibrating
+            del self.results[manufacturer]
+        return plan
+
+    def apply_catalog_years(self, manufacturer):
+        """Set each model's years/chassis list in the results to the catalog's."""
+        data_type = self.get_data_type(manufacturer)
+        for model, years_or_chassis in self.catalog.models(manufacturer).items():
+            self.results[manufacturer]["models"].setdefault(model, {})[data_type] = years_or_chassis
+
+    def log_plan_estimate(self, plan):
+        """Log how much work the calibrate phase has and roughly how long it will take."""
+        seconds_per_ymm = self.catalog.data.get("seconds_per_ymm") or self.DEFAULT_SECONDS_PER_YMM
+        total = sum(len(tasks) for tasks in plan.values())
+        for manufacturer, tasks in plan.items():
+            logger.info(f"  {manufacturer}: {len(tasks)} YMMs")
+        # Upper bound on parallelism; the controller may run fewer workers
+        minutes = total * seconds_per_ymm / max(1, self.concurrency.max_workers) / 60
+        logger.info(f"Calibration plan: {total} YMMs across {len(plan)} manufacturers, "
+                    f"about {minutes:.0f} min at {seconds_per_ymm:.0f}s per YMM "
+                    f"with {self.concurrency.max_workers} workers")
+        return total
+
+    async def calibrate_from_catalog(self, manufacturers, dry_run=False):
+        """Scrape calibration data for the due YMMs listed in the catalog."""
+        plan = self.plan_calibration(manufacturers)
+        self.log_plan_estimate(plan)
+        if dry_run:
+            return
+
+        for manufacturer, tasks in plan.items():
+            if self.out_of_time():
+                logger.info(f"Time budget spent, skipping {manufacturer}")
+                continue
+            logger.info(f"===== Calibrating {manufacturer}: {len(tasks)} YMMs =====")
+            self.init_manufacturer_results(manufacturer)
+            self.apply_catalog_years(manufacturer)
             try:
-                await self.process_manufacturer(manufacturer)
+                async with self.browser_session():
+                    await self.run_tasks(tasks)
             except Exception as e:
-                logger.error(f"Failed to process manufacturer {manufacturer}: {e}")
+                logger.error(f"Failed to calibrate manufacturer {manufacturer}: {e}")
+            self.release_manufacturer(manufacturer)
+            self.fingerprints.save()
+            self.panel_cache.save()
+            self.selector_cache.save()
+            self.timeouts.save()
+
+    async def run(self, time_budget=None, phase="all", shard=None, dry_run=False):
+        """Run the scraper for all manufacturers, optionally stopping after `time_budget` seconds.
+
+        `phase` is "all" (discover and scrape together), "catalog" (walk the
+        menus into catalog.json) or "calibrate" (scrape the due YMMs listed
+        in catalog.json). `shard` is a (zero-based index, count) pair that
+        limits a calibrate run to its share of the manufacturers.
+        """
+        start_time = time.time()
+        logger.info(f"Starting Model/Year scraper ({phase} phase)")
+        if time_budget:
+            self.run_deadline = time.monotonic() + time_budget
+            logger.info(f"Time budget: {time_budget:.0f} seconds")
+
+        manufacturers = self.MANUFACTURERS
+        if shard:
+            sizes = {m: self.catalog.ymm_count(m) for m in manufacturers}
+            manufacturers = assign_shard(manufacturers, sizes, *shard)
+            logger.info(f"Shard {shard[0] + 1}/{shard[1]}: {', '.join(manufacturers)}")
+        
+        # Process manufacturers with the most urgent refreshes first
+        manufacturers = self.scheduler.order_manufacturers(
+            manufacturers,
+            lambda m: self.results.get(m) or self.load_existing_results(m)
+        )
+        if phase == "calibrate":
+            await self.calibrate_from_catalog(manufacturers, dry_run=dry_run)
+            if dry_run:
+                return
+        else:
+            for manufacturer in manufacturers:
+                if self.out_of_time():
+                    logger.info(f"Time budget spent, skipping {manufacturer}")
+                    continue
+                try:
+                    await self.process_manufacturer(manufacturer, catalog_only=phase == "catalog")
+                except Exception as e:
+                    logger.error(f"Failed to process manufacturer {manufacturer}: {e}")
+                self.release_manufacturer(manufacturer)
+        
+        # Retry tasks that failed or were paused by a circuit breaker
+        await self.process_retry_queue()
         
         # Save all results at the end
         self.save_results()
+        self.fingerprints.save()
+        self.fingerprints.write_changelog(os.path.join(self.results_dir, "changelogs"))
+        self.panel_cache.save()
+        self.selector_cache.save()
+        self.timeouts.save()
+        self.panel_cache.log_stats()
+        self.timeouts.log_stats()
+        if self.ymm_durations:
+            self.catalog.data["seconds_per_ymm"] = sum(self.ymm_durations) / len(self.ymm_durations)
+        if not shard:
+            self.catalog.save()
         
         end_time = time.time()
+        if self.deferred_tasks:
+            logger.info(f"{self.deferred_tasks} tasks left for the next run")
+        if self.deadline_overruns:
+            logger.info(f"{self.deadline_overruns} task attempts ran past their {self.ymm_budget:g}s budget")
         logger.info(f"Scraping completed in {end_time - start_time:.2f} seconds")
 
     async def select_year_or_chassis(self, page, year_or_chassis, manufacturer, model):
@@ -1624,90 +2121,86 @@ class ModelYearScraper:
         try:
             logger.info(f"Selecting {year_or_chassis} for {manufacturer} - {model}")
             
-            # FIRST: Check directly if year elements are visible on the page
-            visible_elements = await page.evaluate("""() => {
-                // Get all visible elements with text content
-                return Array.from(document.querySelectorAll('*'))
-                    .filter(el => el.offsetParent !== null && el.textContent.trim())
-                    .map(el => el.textContent.trim())
-                    .filter(text => /^(19|20)[0-9]{2}/.test(text) || // Years like 2022
-                                /^[A-Z][0-9]{2}$/.test(text) || // Chassis codes like F30
-                                /^[0-9]{4}-[0-9]{4}$/.test(text)); // Year ranges like 2019-2022
-            }""")
+            plan = self.navigation_plan(manufacturer)
+            layout_cached = plan.year_layout is not None
+            if layout_cached:
+                # Layout already known for this manufacturer: skip the page scans
+                is_table_view = plan.year_layout == TABLE
+            else:
+                revealed_by_header = False
+                # FIRST: Check directly if year elements are visible on the page
+                visible_elements = await list_menu_items(page, pattern=YEAR_LIKE_PATTERN)
             
-            logger.info(f"Visible year-like elements on page: {visible_elements}")
+                logger.info(f"Visible year-like elements on page: {visible_elements}")
             
-            # Check if our target year is in the visible elements
-            year_visible = year_or_chassis in visible_elements
-            logger.info(f"Year '{year_or_chassis}' directly visible on page: {year_visible}")
+                # Check if our target year is in the visible elements
+                year_visible = year_or_chassis in visible_elements
+                logger.info(f"Year '{year_or_chassis}' directly visible on page: {year_visible}")
             
-            if not year_visible:
-                # If year not visible, see if we need to click something to reveal years
-                headers = await page.evaluate("""() => {
-                    return Array.from(document.querySelectorAll('h3.title, th, .dropbox-header'))
-                        .filter(el => el.offsetParent !== null)
-                        .map(el => ({
-                            text: el.textContent.trim(),
-                            tagName: el.tagName,
-                            className: el.className
-                        }));
-                }""")
+                if not year_visible:
+                    # If year not visible, see if we need to click something to reveal years
+                    headers = await page.evaluate("""() => {
+                        return Array.from(document.querySelectorAll('h3.title, th, .dropbox-header'))
+                            .filter(el => el.offsetParent !== null)
+                            .map(el => ({
+                                text: el.textContent.trim(),
+                                tagName: el.tagName,
+                                className: el.className
+                            }));
+                    }""")
                 
-                logger.info(f"Visible headers on page: {headers}")
+                    logger.info(f"Visible headers on page: {headers}")
                 
-                # Look for something like "Year" or "System" to click
-                year_header = None
-                for header in headers:
-                    if "year" in header["text"].lower() or "system" in header["text"].lower():
-                        year_header = header
-                        break
+                    # Look for something like "Year" or "System" to click
+                    year_header = None
+                    for header in headers:
+                        if "year" in header["text"].lower() or "system" in header["text"].lower():
+                            year_header = header
+                            break
                 
-                if year_header:
-                    logger.info(f"Found potential year header: {year_header}")
+                    if year_header:
+                        logger.info(f"Found potential year header: {year_header}")
                     
-                    # Try to click this header to reveal years
-                    try:
-                        year_header_text = year_header["text"]
-                        header_selector = f"//*[contains(@class, '{year_header['className']}') and contains(text(), '{year_header_text}')]"
-                        header_element = await page.wait_for_selector(header_selector, timeout=1000)
+                        # Try to click this header to reveal years
+                        try:
+                            year_header_text = year_header["text"]
+                            header_selector = f"//*[contains(@class, '{year_header['className']}') and contains(text(), '{year_header_text}')]"
+                            header_element = await page.wait_for_selector(header_selector, timeout=1000)
                         
-                        if header_element:
-                            await header_element.click()
-                            logger.info(f"Clicked on header: {year_header_text}")
-                            await page.wait_for_timeout(1000)
+                            if header_element:
+                                await header_element.click()
+                                logger.info(f"Clicked on header: {year_header_text}")
+                                revealed_by_header = True
+                                await page.wait_for_timeout(1000)
                             
-                            # Check again if years are visible
-                            visible_elements = await page.evaluate("""() => {
-                                return Array.from(document.querySelectorAll('*'))
-                                    .filter(el => el.offsetParent !== null && el.textContent.trim())
-                                    .map(el => el.textContent.trim())
-                                    .filter(text => /^(19|20)[0-9]{2}/.test(text) || // Years like 2022
-                                                /^[A-Z][0-9]{2}$/.test(text) || // Chassis codes like F30
-                                                /^[0-9]{4}-[0-9]{4}$/.test(text)); // Year ranges like 2019-2022
-                            }""")
+                                # Check again if years are visible
+                                visible_elements = await list_menu_items(page, pattern=YEAR_LIKE_PATTERN)
                             
-                            logger.info(f"Visible year-like elements after clicking header: {visible_elements}")
-                            year_visible = year_or_chassis in visible_elements
-                            logger.info(f"Year '{year_or_chassis}' visible after clicking header: {year_visible}")
-                    except Exception as e:
-                        logger.warning(f"Error clicking year header: {e}")
+                                logger.info(f"Visible year-like elements after clicking header: {visible_elements}")
+                                year_visible = year_or_chassis in visible_elements
+                                logger.info(f"Year '{year_or_chassis}' visible after clicking header: {year_visible}")
+                        except Exception as e:
+                            logger.warning(f"Error clicking year header: {e}")
             
-            # Check if we're in a table view with years visible
-            is_table_view = await page.evaluate("""(yearValue) => {
-                // Check if there's a table or list of years visible
-                const tableElements = document.querySelectorAll('table td, div.year-list li, .year-column li, .dropbox.level3 li');
+                # Check if we're in a table view with years visible
+                is_table_view = await page.evaluate("""(yearValue) => {
+                    // Check if there's a table or list of years visible
+                    const tableElements = document.querySelectorAll('table td, div.year-list li, .year-column li, .dropbox.level3 li');
                 
-                if (tableElements.length > 0) {
-                    // Look for exact match
-                    for (const el of tableElements) {
-                        if (el.textContent.trim() === yearValue) {
-                            return true;
+                    if (tableElements.length > 0) {
+                        // Look for exact match
+                        for (const el of tableElements) {
+                            if (el.textContent.trim() === yearValue) {
+                                return true;
+                            }
                         }
                     }
-                }
                 
-                return false;
-            }""", year_or_chassis)
+                    return false;
+                }""", year_or_chassis)
+                # Only remember a table that showed up without help from a header click
+                if is_table_view and not revealed_by_header:
+                    self.learn_layout(manufacturer, "year", TABLE)
             
 
             
@@ -1727,7 +2220,7 @@ class ModelYearScraper:
                 ]
                 
                 clicked = False
-                for selector in selectors:
+                for selector in self.selector_cache.order(manufacturer, "year", selectors, year_or_chassis):
                     try:
                         logger.info(f"Trying to click year with selector: {selector}")
                         # Only wait 1 second for each selector to avoid long timeouts
@@ -1735,57 +2228,25 @@ class ModelYearScraper:
                         if await element.count() > 0:
                             await element.click()
                             logger.info(f"Successfully clicked year {year_or_chassis} in table view")
+                            self.selector_cache.record(manufacturer, "year", selector, True, year_or_chassis)
                             clicked = True
                             break
                     except Exception as e:
                         logger.debug(f"Selector {selector} failed: {e}")
+                    self.selector_cache.record(manufacturer, "year", selector, False, year_or_chassis)
                 
                 if not clicked:
                     # FALLBACK: Try a direct JavaScript approach to click the exact text
                     logger.info("Trying direct JavaScript year selection as fallback")
-                    clicked = await page.evaluate("""(yearValue) => {
-                        // More aggressive approach: Find ANY element that has the exact year text
-                        // and click it directly without any CSS selectors
-                        const yearElements = [];
-                        
-                        // Get all text nodes in the document
-                        const walker = document.createTreeWalker(
-                            document.body, 
-                            NodeFilter.SHOW_TEXT, 
-                            null, 
-                            false
-                        );
-                        
-                        // Walk through all text nodes
-                        while (walker.nextNode()) {
-                            const textNode = walker.currentNode;
-                            const text = textNode.textContent.trim();
-                            
-                            // If the text matches our year exactly
-                            if (text === yearValue) {
-                                const parent = textNode.parentNode;
-                                
-                                // Skip hidden elements
-                                if (parent.offsetParent === null) continue;
-                                
-                                // Store for potential clicking
-                                yearElements.push(parent);
-                            }
-                        }
-                        
-                        // Click the first match if any found
-                        if (yearElements.length > 0) {
-                            yearElements[0].click();
-                            return true;
-                        }
-                        
-                        return false;
-                    }""", year_or_chassis)
+                    clicked = await click_menu_item(page, year_or_chassis)
                     
                     if clicked:
                         logger.info(f"Successfully clicked year {year_or_chassis} with direct JavaScript approach")
                         # Wait for the click to take effect
                         await page.wait_for_timeout(2000)
+                    elif layout_cached:
+                        self.forget_layout(manufacturer, "year")
+                        return await self.select_year_or_chassis(page, year_or_chassis, manufacturer, model)
                     else:
                         logger.warning(f"Direct JavaScript approach failed to click year {year_or_chassis}")
                 
@@ -1793,13 +2254,13 @@ class ModelYearScraper:
                 await page.wait_for_timeout(2000)
 
                 # Special handling for Audi and Volkswagen - need to select Engine/vehicle configuration first
-                if manufacturer in {'AUDI', 'VOLKSWAGEN'}:
+                if plan.vehicle_config:
                     logger.info(f"Special handling for {manufacturer} - selecting Engine/vehicle configuration")
                     
                     # First click the Engine/vehicle configuration field to reveal options
                     engine_config_selector = "input[placeholder='Engine/vehicle configuration/System']"
                     try:
-                        engine_config_element = await page.wait_for_selector(engine_config_selector, timeout=2000)
+                        engine_config_element = await self.wait_for(page, engine_config_selector, "engine_config_field", 2000)
                         if engine_config_element:
                             logger.info("Found Engine/vehicle configuration field")
                             await engine_config_element.click()
@@ -1859,7 +2320,7 @@ class ModelYearScraper:
                 # Now check if System field is visible
                 try:
                     # For Audi/VW, check if options are already visible first
-                    if manufacturer in {'AUDI', 'VOLKSWAGEN'}:
+                    if plan.vehicle_config:
                         # Check if options are already visible
                         options_visible = await page.evaluate("""() => {
                             const options = Array.from(document.querySelectorAll('li'))
@@ -1880,7 +2341,7 @@ class ModelYearScraper:
                     # For other manufacturers or if Audi/VW options aren't visible yet
                     # Look for System input (similar to Product Type selector)
                     system_selector = "input[placeholder='System']"
-                    system_element = await page.wait_for_selector(system_selector, timeout=2000)
+                    system_element = await self.wait_for(page, system_selector, "system_field", 2000)
                     if system_element:
                         logger.info("System field is visible")
                         return True
@@ -1898,14 +2359,15 @@ class ModelYearScraper:
             logger.info("Table view not found, trying dropdown selector for year")
             
             # Use the interaction method to click on the year/chassis
-            if await self.interact_with_dropdown(page, "Year/System", year_or_chassis, True):
+            if await self.interact_with_dropdown(page, "Year/System", year_or_chassis, True, manufacturer):
                 logger.info(f"Successfully selected {year_or_chassis}")
+                self.learn_layout(manufacturer, "year", DROPDOWN)
                 
                 # Wait for the System field to appear
                 try:
                     # Look for System input or dropdown
                     system_selector = "input[placeholder='System']"
-                    system_element = await page.wait_for_selector(system_selector, timeout=2000)
+                    system_element = await self.wait_for(page, system_selector, "system_field", 2000)
                     if system_element:
                         logger.info("System field is visible")
                         return True
@@ -1963,30 +2425,13 @@ class ModelYearScraper:
             # Take screenshot for debugging
             await page.screenshot(path=f"debug_info/before_{system_name}_click.png")
             
-            # For these systems, we know they appear in a reliable location
-            # Just click directly where they typically appear based on their order
-            items = await page.query_selector_all("li")
-            
-            # Filter to just short text items that are likely our ADAS systems
-            visible_items = []
-            for item in items:
-                text = await item.text_content()
-                is_visible = await page.evaluate("""(el) => {
-                    return el.offsetParent !== null && 
-                          el.textContent.trim().length < 10;
-                }""", item)
-                
-                if is_visible and text.strip() in ["ACC", "LDW"]:
-                    visible_items.append({"element": item, "text": text.strip()})
-            
-            # Log what we found
-            logger.info(f"Found {len(visible_items)} potential system options: {[item['text'] for item in visible_items]}")
+            # One lookup in the menu index instead of an evaluate per <li>
+            visible_items = await list_menu_items(page, pattern="^(ACC|LDW)$")
+            logger.info(f"Found {len(visible_items)} potential system options: {visible_items}")
             
-            # Find the one matching our system name
-            for item in visible_items:
-                if item["text"] == system_name:
-                    logger.info(f"Found exact match for {system_name}, clicking it")
-                    await item["element"].click()
+            if system_name in visible_items:
+                logger.info(f"Found exact match for {system_name}, clicking it")
+                if await click_menu_item(page, system_name):
                     return True
             
             logger.warning(f"No exact match found for {system_name}")
@@ -1996,6 +2441,96 @@ class ModelYearScraper:
             logger.error(f"Error in _try_select_specific_system: {e}")
             return False
     
+    async def get_panel_hash(self, page):
+        """Hash the visible calibration panel's text and diagram URLs."""
+        try:
+            panel = await page.evaluate("""() => {
+                const visible = el => el.offsetParent !== null;
+                let containers = Array.from(document.querySelectorAll('.calibration-container')).filter(visible);
+                if (containers.length === 0) {
+                    containers = Array.from(document.querySelectorAll('.swiper-slide')).filter(visible);
+                }
+                return {
+                    texts: containers.map(el => el.innerText),
+                    images: Array.from(document.querySelectorAll('img'))
+                        .filter(img => visible(img) &&
+                                       !img.src.includes('coverage-p1.jpg') &&
+                                       img.src.includes('download1.auteltech.net'))
+                        .map(img => img.src)
+                };
+            }""")
+            return panel_hash(panel["texts"], panel["images"])
+        except Exception as e:
+            logger.debug(f"Could not hash calibration panel: {e}")
+            return None
+
+    async def wait_for_panel(self, page, previous_hash=None, timeout_ms=3000, interval_ms=250):
+        """Hash of the calibration panel once it has changed from `previous_hash` and stopped changing.
+
+        The panel counts as settled when two polls `interval_ms` apart give
+        the same hash. If it never differs from `previous_hash` within
+        `timeout_ms` (capped by the task's budget), the last stable hash is
+        returned, since two systems may share a panel; None if the panel
+        never settled.
+        """
+        timeout_ms, _ = self.step_timeout("calibration_panel", timeout_ms)
+        deadline = time.monotonic() + timeout_ms / 1000
+        last = await self.get_panel_hash(page)
+        stable = None
+        while time.monotonic() < deadline:
+            await page.wait_for_timeout(interval_ms)
+            current = await self.get_panel_hash(page)
+            if current is not None and current == last:
+                stable = current
+                if current != previous_hash:
+                    return current
+            last = current
+        return stable
+
+    async def get_adas_value(self, page, attempts=1, previous_hash=None):
+        """Derive an ADAS value from the calibration panel: the CSC code, else the calibration type.
+
+        Panels already seen, on this or an earlier run, are answered from
+        the panel cache without detection or OCR. `previous_hash` is the
+        panel shown before the system was selected; the lookup waits until
+        the panel has moved on from it and settled, and the same hash is
+        used to store the result. A static panel whose CSC code could not
+        be read is not cached, so the next visit tries OCR again.
+        """
+        key = await self.wait_for_panel(page, previous_hash)
+        cached = self.panel_cache.get(key)
+        if cached:
+            logger.info(f"Calibration panel seen before, reusing: {cached}")
+            return cached
+
+        calibration_type = None
+        for attempt in range(attempts):
+            calibration_type = await self.get_calibration_type(page)
+            if calibration_type:
+                break
+            if attempts > 1:
+                logger.info(f"Calibration type not found, retry {attempt+1}/{attempts}")
+                await page.wait_for_timeout(1000)  # Wait a bit between retries
+
+        if not calibration_type:
+            return None
+        logger.info(f"Detected calibration type: {calibration_type}")
+
+        # If static is in the calibration type, try to get CSC model
+        adas_value = calibration_type
+        if "Static" in calibration_type:
+            # Look for CSC model in the page
+            csc_model = await self.get_csc_code(page)
+            if csc_model:
+                logger.info(f"Found CSC model: {csc_model}")
+                adas_value = csc_model
+            else:
+                logger.info("No CSC model found, returning calibration type")
+                return adas_value
+
+        self.panel_cache.put(key, adas_value)
+        return adas_value
+
     async def get_calibration_type(self, page):
         """Detect calibration type (Static, Dynamic, or both)."""
         try:
@@ -2124,11 +2659,11 @@ class ModelYearScraper:
                     
                     # Take a screenshot of the image for OCR
                     # First find the image element
-                    img_element = await page.wait_for_selector(f"img[src='{img_url}']", timeout=2000)
+                    img_element = await self.wait_for(page, f"img[src='{img_url}']", "panel_image", 2000)
                     if img_element:
                         # Perform OCR on the screenshot
                         img = Image.open(io.BytesIO(await img_element.screenshot()))
-                        text = pytesseract.image_to_string(img)
+                        text = await self.ocr(img)
                         
                         # Search for CSC code patterns in the OCR text
                         csc_patterns = [
@@ -2154,11 +2689,14 @@ class ModelYearScraper:
                     # If screenshot method failed, try downloading the image
                     try:
                         # Download the image
-                        response = requests.get(img_url, stream=True, timeout=5)
+                        await self.rate_limiter.acquire(img_url)
+                        remaining = self.remaining_budget()
+                        response = await asyncio.to_thread(requests.get, img_url, stream=True,
+                                                           timeout=min(5, remaining) if remaining else 5)
                         if response.status_code == 200:
                             # Perform OCR on downloaded image
                             img = Image.open(io.BytesIO(response.content))
-                            text = pytesseract.image_to_string(img)
+                            text = await self.ocr(img)
                             
                             # Search for CSC code patterns in the OCR text
                             for pattern in csc_patterns:
@@ -2191,8 +2729,57 @@ class ModelYearScraper:
             return None
 
 async def main():
-    scraper = ModelYearScraper()
-    await scraper.run()
+    parser = argparse.ArgumentParser(description="Scrape model/year ADAS calibration data from MaxiSys")
+    parser.add_argument('--headless', action='store_true', help="Run the browser without a window")
+    parser.add_argument('--min-workers', type=int, default=1, help="Lowest number of concurrent page workers")
+    parser.add_argument('--max-workers', type=int, default=4, help="Highest number of concurrent page workers")
+    parser.add_argument('--rate-limit-db', help="SQLite file for a rate limit shared with other scraper processes")
+    parser.add_argument('--ttl-days', type=float, default=30, help="Days before a YMM's ADAS data is refreshed")
+    parser.add_argument('--make-ttl', action='append', default=[], metavar='MAKE=DAYS',
+                        help="Per-manufacturer TTL override, e.g. TOYOTA=7 (repeatable)")
+    parser.add_argument('--time-budget', type=float, help="Stop starting new tasks after this many minutes")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Scrape calibration data even when a YMM's system menu is unchanged")
+    parser.add_argument('--phase', choices=['all', 'catalog', 'calibrate'], default='all',
+                        help="catalog: only walk the menus; calibrate: scrape the due YMMs in catalog.json")
+    parser.add_argument('--shard', metavar='I/N', help="Calibrate only shard I of N (1-based)")
+    parser.add_argument('--dry-run', action='store_true', help="Log the calibrate plan and estimate, then exit")
+    parser.add_argument('--ymm-budget', type=float, default=ModelYearScraper.DEFAULT_YMM_BUDGET,
+                        help="Seconds one attempt at a YMM or model discovery may take before it is re-queued (0 disables)")
+    parser.add_argument('--tesseract-cmd', help="Path to the tesseract binary (default: $TESSERACT_CMD, "
+                                                "the standard Windows install, or tesseract on the PATH)")
+    args = parser.parse_args()
+
+    if args.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+
+    shard = None
+    if args.shard:
+        if args.phase != 'calibrate':
+            parser.error("--shard only applies to --phase calibrate")
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    ttl_by_make = {}
+    for entry in args.make_ttl:
+        make, _, days = entry.partition('=')
+        try:
+            ttl_by_make[make.strip().upper()] = float(days)
+        except ValueError:
+            parser.error(f"Invalid --make-ttl value: {entry}")
+
+    scraper = ModelYearScraper(
+        headless=args.headless,
+        concurrency=AdaptiveConcurrencyController(min_workers=args.min_workers, max_workers=args.max_workers),
+        rate_limiter=RateLimiter(host_rates=ModelYearScraper.HOST_RATE_LIMITS, shared_path=args.rate_limit_db),
+        scheduler=RefreshScheduler(default_ttl_days=args.ttl_days, ttl_by_make=ttl_by_make),
+        full_refresh=args.full_refresh,
+        ymm_budget=args.ymm_budget
+    )
+    await scraper.run(time_budget=args.time_budget * 60 if args.time_budget else None,
+                      phase=args.phase, shard=shard, dry_run=args.dry_run)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
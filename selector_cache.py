@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def selector_template(selector, text):
+    """The selector with the quoted lookup text taken out, so "li:has-text('Q5')" and "li:has-text('A4')" share stats."""
+    return selector.replace(f"'{text}'", "'{}'") if text else selector
+
+
+class SelectorCache:
+    """Learned order of fallback selectors for each manufacturer and step.
+
+    Every selector keeps a score: a moving average of whether it matched,
+    starting at `prior` when it has never been tried. Candidates are tried
+    highest score first, ties in the order the code lists them, so the
+    selector that last worked for a manufacturer leads, and one that stops
+    matching sinks below the untried alternatives after a couple of misses.
+    """
+
+    def __init__(self, path, decay=0.7, prior=0.5):
+        self.path = path
+        self.decay = decay
+        self.prior = prior
+        self.scores = self._load()
+        self.changed = set()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading selector cache from {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def key(manufacturer, step):
+        return f"{manufacturer or '*'}|{step}"
+
+    def order(self, manufacturer, step, selectors, text=None):
+        """`selectors` in the order they should be tried."""
+        scores = self.scores.get(self.key(manufacturer, step), {})
+        ranked = sorted(enumerate(selectors),
+                        key=lambda item: (-scores.get(selector_template(item[1], text), self.prior), item[0]))
+        return [selector for _, selector in ranked]
+
+    def record(self, manufacturer, step, selector, matched, text=None):
+        key = self.key(manufacturer, step)
+        scores = self.scores.setdefault(key, {})
+        template = selector_template(selector, text)
+        previous = scores.get(template, self.prior)
+        scores[template] = round(self.decay * previous + (1 - self.decay) * (1.0 if matched else 0.0), 4)
+        self.changed.add(key)
+
+    def save(self):
+        """Persist learned scores, keeping other processes' scores for steps this one didn't touch."""
+        scores = self._load()
+        scores.update({key: self.scores[key] for key in self.changed})
+        self.scores = scores
+        self.changed = set()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(scores, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def race_selectors(page, selectors, timeout=2000, accept=None):
+    """Wait for all `selectors` at once and return (index, element, misses) for the first to match.
+
+    `accept`, if given, is an async check on a matched element; a rejected
+    match counts as a miss and the race goes on with the others. The worst
+    case is one `timeout` rather than one per selector. `misses` lists the
+    indexes that timed out or were rejected before the winner, so callers
+    can learn from them; index and element are None when nothing matched.
+    """
+    async def wait(index, selector):
+        element = await page.wait_for_selector(selector, timeout=timeout)
+        if element is None or (accept and not await accept(element)):
+            raise LookupError(f"Rejected match for {selector}")
+        return index, element
+
+    tasks = {asyncio.create_task(wait(index, selector)): index for index, selector in enumerate(selectors)}
+    pending = set(tasks)
+    misses = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winners = []
+            for task in done:
+                if task.exception() is None:
+                    winners.append(task.result())
+                else:
+                    logger.debug(f"Selector {selectors[tasks[task]]} failed: {task.exception()}")
+                    misses.append(tasks[task])
+            if winners:
+                # Several can finish in the same tick; prefer the earliest in the caller's order
+                index, element = min(winners, key=lambda winner: winner[0])
+                return index, element, misses
+        return None, None, sorted(misses)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,36 @@
+import json
+
+from model_filters import ModelFilter, merge_rules
+
+
+def test_merge_rules_concatenates_lists_and_merges_makes():
+    base = {"deny_keywords": ["A"], "makes": {"BMW": {"deny_keywords": ["X"]}}, "require_pattern": "^a"}
+    rules = {"deny_keywords": ["B"], "makes": {"BMW": {"deny_keywords": ["Y"]}, "MINI": {}}, "require_pattern": "^b"}
+    assert merge_rules(base, rules) == {
+        "deny_keywords": ["A", "B"],
+        "makes": {"BMW": {"deny_keywords": ["X", "Y"]}, "MINI": {}},
+        "require_pattern": "^b",
+    }
+
+
+def test_load_resolves_extends(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "base": {"deny_keywords": ["CHASSIS"], "makes": {"FORD": {"always_allow": ["F-150 Chassis"]}}},
+        "strict": {"extends": "base", "require_pattern": "^[A-Z0-9]"},
+    }))
+    model_filter = ModelFilter.load("strict", str(path))
+    assert model_filter.is_valid("Camry", "Toyota")
+    assert not model_filter.is_valid("Cab Chassis", "Toyota")
+    assert not model_filter.is_valid("select a model", "Toyota")
+    assert model_filter.is_valid("F-150 Chassis", "Ford")
+
+
+def test_make_rules_apply_only_to_their_make(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "rules": {"makes": {"MINI": {"require_keywords": ["Cooper"]}}},
+    }))
+    model_filter = ModelFilter.load("rules", str(path))
+    assert model_filter.filter(["Cooper S", "Clubman"], "Mini") == ["Cooper S"]
+    assert model_filter.filter(["Clubman"], "BMW") == ["Clubman"]
@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+
+from retry_policy import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, NavigationError, RetryPolicy, ScrapeError,
+    ScrapeTimeoutError, SelectorNotFoundError, classify_error,
+)
+from scrape_tasks import ScrapeTask
+
+
+def make_task():
+    return ScrapeTask("HONDA", "Honda(CANADA)", "Civic", "2024")
+
+
+def flaky(failures, error=TimeoutError("wait timed out")):
+    """An operation that raises `error` `failures` times and then succeeds."""
+    calls = []
+
+    async def operation():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise error
+        return "done"
+
+    operation.calls = calls
+    return operation
+
+
+def test_classify_error():
+    assert isinstance(classify_error(TimeoutError("x")), ScrapeTimeoutError)
+    assert isinstance(classify_error(Exception("net::ERR_CONNECTION_RESET")), NavigationError)
+    assert isinstance(classify_error(Exception("Could not find option 'ACC'")), SelectorNotFoundError)
+    unknown = ValueError("boom")
+    classified = classify_error(unknown)
+    assert type(classified) is ScrapeError and classified.__cause__ is unknown
+    deadline = DeadlineExceededError("late")
+    assert classify_error(deadline) is deadline
+
+
+def test_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0)
+    assert [policy.backoff(attempt) for attempt in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_retries_until_success():
+    task = make_task()
+    operation = flaky(2)
+    assert asyncio.run(RetryPolicy(max_attempts=3, base_delay=0).run(operation, task)) == "done"
+    assert task.attempts == 3
+
+
+def test_gives_up_after_max_attempts():
+    task = make_task()
+    operation = flaky(5)
+    with pytest.raises(ScrapeTimeoutError):
+        asyncio.run(RetryPolicy(max_attempts=3, base_delay=0).run(operation, task))
+    assert len(operation.calls) == 3
+    assert task.last_error == "timeout: wait timed out"
+
+
+def test_task_budget_spans_passes():
+    task = make_task()
+    task.attempts = 5
+    operation = flaky(5)
+    with pytest.raises(ScrapeTimeoutError):
+        asyncio.run(RetryPolicy(max_attempts=3, task_budget=6, base_delay=0).run(operation, task))
+    assert len(operation.calls) == 1
+
+
+def test_deadline_is_not_retried():
+    task = make_task()
+    operation = flaky(1, DeadlineExceededError("late"))
+    breaker = CircuitBreaker()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(RetryPolicy(base_delay=0).run(operation, task, breaker))
+    assert len(operation.calls) == 1
+    assert task.last_error == "deadline: late"
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        breaker.record_failure("HONDA")
+    assert breaker.allow("HONDA")
+    breaker.record_failure("HONDA")
+    assert breaker.is_open("HONDA") and not breaker.allow("HONDA")
+    assert breaker.allow("MAZDA")
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure("HONDA")
+    breaker.record_success("HONDA")
+    breaker.record_failure("HONDA")
+    assert breaker.is_closed("HONDA")
+
+
+def test_half_open_admits_one_probe():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure("HONDA")
+        assert breaker.allow("HONDA")
+        assert breaker.probe_in_flight("HONDA")
+        assert not breaker.allow("HONDA")
+
+        # A failed probe re-opens the circuit for another cooldown
+        breaker.record_failure("HONDA")
+        assert not breaker.is_closed("HONDA") and not breaker.probe_in_flight("HONDA")
+
+        assert breaker.allow("HONDA")
+        breaker.record_success("HONDA")
+        assert breaker.is_closed("HONDA") and breaker.allow("HONDA")
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_probe_lets_the_next_task_probe():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure("HONDA")
+        assert breaker.allow("HONDA")
+        breaker.abandon_probe("HONDA")
+        assert breaker.allow("HONDA")
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_raises_circuit_open():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.record_failure("HONDA")
+    operation = flaky(0)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(RetryPolicy().run(operation, make_task(), breaker))
+    assert operation.calls == []
+
+
+def test_tasks_wait_for_the_half_open_probe():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure("HONDA")
+        probe_started = asyncio.Event()
+        release_probe = asyncio.Event()
+        order = []
+
+        async def probe():
+            order.append("probe")
+            probe_started.set()
+            await release_probe.wait()
+            return "probe"
+
+        async def follower():
+            order.append("follower")
+            return "follower"
+
+        policy = RetryPolicy(base_delay=0)
+        probe_run = asyncio.create_task(policy.run(probe, make_task(), breaker))
+        await probe_started.wait()
+        follower_run = asyncio.create_task(policy.run(follower, make_task(), breaker))
+        await asyncio.sleep(0)
+        assert order == ["probe"]
+
+        release_probe.set()
+        assert await asyncio.gather(probe_run, follower_run) == ["probe", "follower"]
+        assert order == ["probe", "follower"] and breaker.is_closed("HONDA")
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_probe_is_abandoned():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure("HONDA")
+
+        async def hang():
+            await asyncio.Event().wait()
+
+        run = asyncio.create_task(RetryPolicy().run(hang, make_task(), breaker))
+        await asyncio.sleep(0)
+        assert breaker.probe_in_flight("HONDA")
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        assert not breaker.probe_in_flight("HONDA")
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+from timeout_policy import TimeoutPolicy
+
+
+def learned_policy(latency_ms=300, samples=200):
+    policy = TimeoutPolicy()
+    for _ in range(samples):
+        policy.record("step", latency_ms)
+    return policy
+
+
+def test_default_until_min_samples():
+    policy = TimeoutPolicy(min_samples=5)
+    for _ in range(4):
+        policy.record("step", 1000)
+    assert policy.timeout("step", 7000) == 7000
+    policy.record("step", 1000)
+    assert policy.timeout("step", 7000) == 1500
+
+
+def test_timeout_is_percentile_times_multiplier_clamped():
+    assert learned_policy(300).timeout("step", 5000) == 500  # floor
+    assert learned_policy(2000).timeout("step", 5000) == 3000
+    assert learned_policy(19000).timeout("step", 5000) == 20000  # ceiling
+
+
+def test_isolated_misses_do_not_ratchet():
+    policy = learned_policy(1000)
+    for _ in range(20):
+        timeout = policy.timeout("step", 5000)
+        policy.record_timeout("step", timeout)
+        policy.record("step", 1000)
+    assert policy.timeout("step", 5000) == 1500
+
+
+def test_repeated_misses_raise_the_timeout():
+    policy = learned_policy(1000)
+    timeouts = []
+    for _ in range(12):
+        timeout = policy.timeout("step", 5000)
+        timeouts.append(timeout)
+        policy.record_timeout("step", timeout)
+    assert timeouts[0] == 1500
+    assert timeouts == sorted(timeouts)
+    assert timeouts[-1] == 20000
+
+
+def test_success_resets_the_miss_streak():
+    policy = learned_policy(1000)
+    policy.record_timeout("step", 1500)
+    policy.record_timeout("step", 1500)
+    policy.record("step", 1000)
+    policy.record_timeout("step", 1500)
+    assert policy.timeout("step", 5000) == 1500
+
+
+def test_hosts_are_kept_apart_and_samples_persist(tmp_path):
+    path = str(tmp_path / "timeouts.json")
+    policy = TimeoutPolicy(path, min_samples=1)
+    policy.record("step", 4000, host="slow.example")
+    policy.record("step", 1000, host="fast.example")
+    policy.save()
+
+    reloaded = TimeoutPolicy(path, min_samples=1)
+    assert reloaded.timeout("step", 9000, host="slow.example") == 6000
+    assert reloaded.timeout("step", 9000, host="fast.example") == 1500
+    assert reloaded.timeout("step", 9000) == 9000
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timedelta
+
+from generate_vehicle_options import VehicleOptionsGenerator
+
+YEARS = {"2024": {"HONDA": ["Accord", "Other"]}}
+
+
+def write_checkpoint(path, generator, saved_at=None, years=YEARS):
+    path.write_text(json.dumps({
+        "params": generator.checkpoint_params(),
+        "saved_at": (saved_at or datetime.now()).isoformat(timespec='seconds'),
+        "years": years,
+    }))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "partial.json"
+    writer = VehicleOptionsGenerator(checkpoint_path=str(path))
+    writer.completed_years = dict(YEARS)
+    writer.save_checkpoint()
+
+    reader = VehicleOptionsGenerator(checkpoint_path=str(path))
+    reader.load_checkpoint()
+    assert reader.completed_years == YEARS
+
+
+def test_checkpoint_from_other_settings_is_ignored(tmp_path):
+    path = tmp_path / "partial.json"
+    write_checkpoint(path, VehicleOptionsGenerator(legacy_queries=True))
+
+    generator = VehicleOptionsGenerator(checkpoint_path=str(path))
+    generator.load_checkpoint()
+    assert generator.completed_years == {}
+
+
+def test_old_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / "partial.json"
+    generator = VehicleOptionsGenerator(checkpoint_path=str(path))
+    write_checkpoint(path, generator, saved_at=datetime.now() - timedelta(days=30))
+
+    generator.load_checkpoint()
+    assert generator.completed_years == {}
+
+
+def test_checkpoint_without_run_settings_is_ignored(tmp_path):
+    path = tmp_path / "partial.json"
+    path.write_text(json.dumps(YEARS))
+
+    generator = VehicleOptionsGenerator(checkpoint_path=str(path))
+    generator.load_checkpoint()
+    assert generator.completed_years == {}
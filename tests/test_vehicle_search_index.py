@@ -0,0 +1,54 @@
+from vehicle_search_index import SearchIndex, normalise, word_suffixes
+
+OPTIONS = {
+    "2024": {
+        "Honda": ["CR-V", "Civic", "Civic Type R", "Other"],
+        "Jeep": ["Grand Cherokee L", "Other"],
+    },
+    "2023": {
+        "Honda": ["Civic", "Other"],
+        "Jeep": ["Cherokee", "Grand Cherokee L", "Other"],
+    },
+}
+
+
+def names(hits):
+    return [(hit["make"], hit["model"]) for hit in hits]
+
+
+def test_normalise_and_word_suffixes():
+    assert normalise("cr-v") == "CRV"
+    assert word_suffixes("Grand Cherokee L") == {"GRANDCHEROKEEL", "CHEROKEEL", "L"}
+
+
+def test_prefix_search_shortest_names_first():
+    index = SearchIndex.build(OPTIONS)
+    assert names(index.search("civ")) == [("Honda", "Civic"), ("Honda", "Civic Type R")]
+    assert index.search("civic")[0]["years"] == ["2024", "2023"]
+
+
+def test_search_ignores_punctuation_and_matches_inner_words():
+    index = SearchIndex.build(OPTIONS)
+    assert names(index.search("crv")) == [("Honda", "CR-V")]
+    assert names(index.search("chero")) == [("Jeep", "Cherokee"), ("Jeep", "Grand Cherokee L")]
+
+
+def test_makes_come_first_and_make_model_queries_work():
+    index = SearchIndex.build(OPTIONS)
+    assert names(index.search("honda", limit=2)) == [("Honda", None), ("Honda", "CR-V")]
+    assert names(index.search("honda civic type")) == [("Honda", "Civic Type R")]
+
+
+def test_year_filter_and_other_is_skipped():
+    index = SearchIndex.build(OPTIONS)
+    assert names(index.search("cherokee", year=2024)) == [("Jeep", "Grand Cherokee L")]
+    assert index.search("other") == []
+    assert index.search("  ") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = SearchIndex.build(OPTIONS)
+    index.save(path)
+    loaded = SearchIndex.load(path)
+    assert loaded.search("civ") == index.search("civ")
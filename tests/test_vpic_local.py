@@ -0,0 +1,39 @@
+import os
+import sqlite3
+
+import pytest
+
+from vpic_local import LocalVpicStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalVpicStore(str(tmp_path / "vpic_local.sqlite"))
+    yield store
+    store.close()
+
+
+def test_ingest_csv_with_vpic_column_names(store):
+    assert store.ingest(os.path.join(FIXTURES, "vpic_models.csv")) == 4
+    assert sorted(store.makes(["passenger car", "truck"])) == ["FORD", "HONDA"]
+    assert store.models("Honda", 2022, ["Passenger Car"]) == ["Accord"]
+    assert store.models("HONDA", 2022, ["multipurpose passenger vehicle (mpv)"]) == ["CR-V"]
+
+
+def test_ingest_sqlite_table(store):
+    assert store.ingest(os.path.join(FIXTURES, "vpic_models.sqlite"), table="vpic_export") == 3
+    assert sorted(store.models("TOYOTA", 2022, ["passenger car", "truck"])) == ["Camry", "Tacoma"]
+    assert store.models("VOLKSWAGEN", 2020, ["passenger car"]) == ["e-Golf"]
+
+
+def test_ingest_sqlite_missing_table(store):
+    with pytest.raises(sqlite3.OperationalError):
+        store.ingest(os.path.join(FIXTURES, "vpic_models.sqlite"))
+
+
+def test_ingest_twice_does_not_duplicate(store):
+    store.ingest(os.path.join(FIXTURES, "vpic_models.csv"))
+    store.ingest(os.path.join(FIXTURES, "vpic_models.csv"))
+    assert store.conn.execute("SELECT COUNT(*) FROM models").fetchone()[0] == 4
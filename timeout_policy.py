@@ -0,0 +1,103 @@
+import json
+import logging
+import math
+import os
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class TimeoutPolicy:
+    """Timeouts learned from how long each step actually takes.
+
+    Keeps the last `window` latencies (ms) per step and host. Once a step
+    has `min_samples`, its timeout is the `percentile` latency times
+    `multiplier`, clamped to [floor_ms, ceiling_ms]; until then the
+    caller's hard-coded default is used. A wait that timed out is a
+    censored sample: all it says is that the latency was at least the
+    timeout. An isolated miss is recorded at the current percentile
+    latency, so one slow wait doesn't ratchet the timeout upwards. After
+    `miss_limit` misses in a row the site is taken to be slower than the
+    samples say, and each further miss is recorded at the timeout it used
+    times `backoff`, so the timeout climbs until waits succeed again.
+    """
+
+    def __init__(self, path=None, percentile=0.99, multiplier=1.5, floor_ms=500, ceiling_ms=20000,
+                 min_samples=20, window=200, miss_limit=3, backoff=2.0):
+        self.path = path
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor_ms = floor_ms
+        self.ceiling_ms = ceiling_ms
+        self.min_samples = min_samples
+        self.window = window
+        self.miss_limit = miss_limit
+        self.backoff = backoff
+        self.misses = {}
+        self.samples = {key: deque(values, maxlen=window) for key, values in self._load().items()}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading timeout samples from {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def key(step, host=None):
+        return f"{host or '*'}|{step}"
+
+    def _append(self, key, latency_ms):
+        if key not in self.samples:
+            self.samples[key] = deque(maxlen=self.window)
+        self.samples[key].append(round(latency_ms))
+
+    def record(self, step, latency_ms, host=None):
+        key = self.key(step, host)
+        self.misses.pop(key, None)
+        self._append(key, latency_ms)
+
+    def record_timeout(self, step, timeout_ms, host=None):
+        """Record a wait that gave up after `timeout_ms`."""
+        key = self.key(step, host)
+        self.misses[key] = self.misses.get(key, 0) + 1
+        if self.misses[key] >= self.miss_limit:
+            # The latency is at least the timeout; back off past it
+            self._append(key, min(self.ceiling_ms, timeout_ms * self.backoff))
+            return
+        latency = self.percentile_latency(step, host)
+        if latency is not None:
+            self._append(key, latency)
+
+    def percentile_latency(self, step, host=None):
+        """The `percentile` latency of `step` in ms, or None before `min_samples` waits."""
+        samples = self.samples.get(self.key(step, host))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)]
+
+    def timeout(self, step, default_ms, host=None):
+        """Timeout in ms for the next wait of `step`."""
+        latency = self.percentile_latency(step, host)
+        if latency is None:
+            return default_ms
+        return int(min(self.ceiling_ms, max(self.floor_ms, latency * self.multiplier)))
+
+    def log_stats(self):
+        for key in sorted(self.samples):
+            host, _, step = key.partition('|')
+            timeout = self.timeout(step, None, None if host == '*' else host)
+            if timeout is not None:
+                logger.info(f"Timeout for {key}: {timeout} ms from {len(self.samples[key])} samples")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({key: list(values) for key, values in self.samples.items()}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip copies are written without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACTS_DIR = 'vehicle_options_dist'
+MANIFEST_FILE = 'manifest.json'
+HASHED_FILE = re.compile(r'\.[0-9a-f]{12}\.json(\.gz|\.br)?$')
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def encode(data):
+    """Compact, deterministic JSON so identical content always gets the same hash."""
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+
+class ArtifactWriter:
+    """Writes vehicle options as small, content-addressed files for a CDN.
+
+    - manifest.json: year -> year file. Fixed name, so it should be served with a short cache.
+    - <year>.<hash>.json: make -> model file for that year.
+    - <year>/<make>.<hash>.json: the models for one year and make.
+    The hashed files never change and can be cached forever. Each one is
+    also written pre-compressed as .gz and, if brotli is installed, .br.
+    Hashed files that neither the new nor the previous manifest refers to
+    are deleted, so clients still holding the old manifest keep working
+    for one more run.
+    """
+
+    def __init__(self, directory=DEFAULT_ARTIFACTS_DIR):
+        self.directory = directory
+        self.files_written = 0
+        self.bytes_written = 0
+
+    def write(self, relative_stem, data):
+        """Write `data` under a content-hashed name and return that name."""
+        body = encode(data)
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        relative_path = f"{relative_stem}.{digest}.json"
+        path = os.path.join(self.directory, relative_path)
+        if not os.path.exists(path):
+            self._write_file(path, body)
+            self._write_file(f"{path}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli:
+                self._write_file(f"{path}.br", brotli.compress(body))
+        return relative_path
+
+    def _write_file(self, path, body):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        self.files_written += 1
+        self.bytes_written += len(body)
+
+    def referenced_files(self, manifest):
+        """Relative paths of the hashed files a manifest refers to, directly or through its year files."""
+        referenced = set()
+        for year_file in (manifest or {}).get("years", {}).values():
+            referenced.add(year_file)
+            try:
+                with open(os.path.join(self.directory, year_file), 'r', encoding='utf-8') as f:
+                    referenced.update(json.load(f).get("makes", {}).values())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read artifact {year_file}: {e}")
+        return referenced
+
+    def load_manifest(self):
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read previous manifest {path}: {e}")
+            return None
+
+    def prune(self, keep):
+        """Delete hashed files (and their .gz/.br copies) not in `keep`; return how many were removed."""
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                relative_path = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                match = HASHED_FILE.search(relative_path)
+                if match and relative_path[:len(relative_path) - len(match.group(1) or '')] not in keep:
+                    os.remove(path)
+                    removed += 1
+        for root, dirs, files in os.walk(self.directory, topdown=False):
+            if root != self.directory and not dirs and not files:
+                os.rmdir(root)
+        return removed
+
+    def write_options(self, results):
+        """Write every year and make of `results` (year -> make -> models) plus the manifest."""
+        previous = self.referenced_files(self.load_manifest())
+        manifest = {"generated_at": datetime.now().isoformat(timespec="seconds"), "years": {}}
+        for year, makes in results.items():
+            year_index = {
+                make: self.write(f"{year}/{slugify(make)}", {"year": year, "make": make, "models": models})
+                for make, models in makes.items()
+            }
+            manifest["years"][year] = self.write(year, {"year": year, "makes": year_index})
+
+        body = json.dumps(manifest, indent=2).encode('utf-8')
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        self._write_file(path, body)
+        self._write_file(f"{path}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli:
+            self._write_file(f"{path}.br", brotli.compress(body))
+
+        logger.info(f"Wrote {self.files_written} artifact files ({self.bytes_written / 1024:.0f} KB) "
+                    f"to {self.directory}{'' if brotli else ' (install brotli for .br copies)'}")
+        removed = self.prune(previous | self.referenced_files(manifest))
+        if removed:
+            logger.info(f"Removed {removed} artifact files no longer referenced by the last two manifests")
+        return manifest
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import re
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_FILE = 'vehicle_search_index.json'
+INDEX_VERSION = 1
+
+
+def normalise(text):
+    """Upper-case and drop everything but letters and digits, so "cr-v" finds "CR-V"."""
+    return re.sub(r'[^A-Z0-9]', '', text.upper())
+
+
+def word_suffixes(text):
+    """The name from each word onwards: "GRAND CHEROKEE L" -> GRANDCHEROKEEL, CHEROKEEL, L."""
+    words = re.split(r'[\s\-/]+', text.upper())
+    return {normalise(''.join(words[i:])) for i in range(len(words))} - {''}
+
+
+class SearchIndex:
+    """Typeahead index over makes and models.
+
+    Entries are (make, model, years); make-only entries have model None.
+    Every entry is reachable from several normalised keys: the model name,
+    the make followed by the model, and each word-suffix of either, so
+    "chero" finds Grand Cherokee. Keys are held in one sorted list and a
+    prefix query is a bisect plus a scan over the matching run.
+    """
+
+    def __init__(self, entries, keys, ids):
+        self.entries = entries
+        self.keys = keys
+        self.ids = ids
+
+    @classmethod
+    def build(cls, results):
+        """Build from vehicle options: year -> make -> models."""
+        years_by_entry = {}
+        for year, makes in results.items():
+            for make, models in makes.items():
+                years_by_entry.setdefault((make, None), set()).add(year)
+                for model in models:
+                    if model != 'Other':
+                        years_by_entry.setdefault((make, model), set()).add(year)
+
+        entries = []
+        pairs = set()
+        for entry_id, ((make, model), years) in enumerate(sorted(years_by_entry.items(),
+                                                                  key=lambda item: (item[0][0], item[0][1] or ''))):
+            entries.append((make, model, sorted(years, reverse=True)))
+            keys = word_suffixes(make) if model is None else (
+                word_suffixes(model) | {normalise(make) + key for key in word_suffixes(model)})
+            pairs.update((key, entry_id) for key in keys)
+
+        ordered = sorted(pairs)
+        index = cls(entries, [key for key, _ in ordered], [entry_id for _, entry_id in ordered])
+        logger.info(f"Built search index: {len(entries)} entries, {len(ordered)} keys")
+        return index
+
+    def search(self, query, limit=10, year=None):
+        """Entries whose keys start with `query`, makes first, optionally only those offered in `year`."""
+        prefix = normalise(query)
+        if not prefix:
+            return []
+
+        found = []
+        seen = set()
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            entry_id = self.ids[position]
+            position += 1
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            make, model, years = self.entries[entry_id]
+            if year is not None and str(year) not in years:
+                continue
+            found.append({"make": make, "model": model, "years": years})
+
+        # Shorter names first: typing "civ" should offer Civic before Civic Type R
+        found.sort(key=lambda hit: (hit["model"] is not None, len(hit["model"] or hit["make"])))
+        return found[:limit]
+
+    def to_dict(self):
+        return {"version": INDEX_VERSION, "entries": self.entries, "keys": self.keys, "ids": self.ids}
+
+    def save(self, path=DEFAULT_INDEX_FILE):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        logger.info(f"Search index saved to {path}")
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version in {path}: {data.get('version')}")
+        return cls([tuple(entry) for entry in data["entries"]], data["keys"], data["ids"])
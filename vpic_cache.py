@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+
+class ResponseCache:
+    """Persistent cache of vPIC API responses, keyed by URL.
+
+    How long a response stays fresh depends on the endpoint and the model
+    year in the URL: years at least `stable_after_years` old never expire,
+    since NHTSA data for historic years essentially never changes. Stale
+    entries are revalidated with ETag/Last-Modified when the server sent
+    them. In offline mode only the cache is used, whatever the age.
+    """
+
+    # Freshness for responses about recent model years, per endpoint
+    ENDPOINT_TTLS = {
+        'GetMakesForVehicleType': 7 * DAY,
+        'GetModelsForMakeYear': 3 * DAY,
+    }
+    DEFAULT_TTL = 1 * DAY
+
+    def __init__(self, path="vpic_cache.sqlite", stable_after_years=2, endpoint_ttls=None, offline=False):
+        self.path = path
+        self.stable_after_years = stable_after_years
+        self.endpoint_ttls = {**self.ENDPOINT_TTLS, **(endpoint_ttls or {})}
+        self.offline = offline
+        self.current_year = datetime.now().year
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        """)
+
+    def ttl(self, url):
+        """Seconds a response for `url` stays fresh, or None if it never expires."""
+        match = re.search(r'(?:modelyear/|year=)(\d{4})', url)
+        if match and int(match.group(1)) <= self.current_year - self.stable_after_years:
+            return None
+        endpoint = re.search(r'/api/vehicles/(\w+)', url)
+        return self.endpoint_ttls.get(endpoint.group(1) if endpoint else None, self.DEFAULT_TTL)
+
+    def _row(self, url):
+        return self.conn.execute(
+            "SELECT body, fetched_at, etag, last_modified FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+
+    def get(self, url):
+        """Return the cached data if it may be used without asking the server, else None."""
+        row = self._row(url)
+        if row is not None:
+            ttl = self.ttl(url)
+            if self.offline or ttl is None or time.time() - row[1] < ttl:
+                self.hits += 1
+                return json.loads(row[0])
+        self.misses += 1
+        if self.offline:
+            logger.warning(f"Offline and not cached: {url}")
+        return None
+
+    def get_stale(self, url):
+        """Return whatever is cached for `url`, however old, or None."""
+        row = self._row(url)
+        return json.loads(row[0]) if row else None
+
+    def validators(self, url):
+        """Conditional request headers for revalidating a stale entry."""
+        row = self._row(url)
+        headers = {}
+        if row and row[2]:
+            headers['If-None-Match'] = row[2]
+        if row and row[3]:
+            headers['If-Modified-Since'] = row[3]
+        return headers
+
+    def revalidated(self, url):
+        """Mark a stale entry fresh after a 304 and return its data."""
+        self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        self.conn.commit()
+        return self.get_stale(url)
+
+    def store(self, url, data, headers=None):
+        headers = headers or {}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (url, body, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+            (url, json.dumps(data), time.time(), headers.get('ETag'), headers.get('Last-Modified'))
+        )
+        self.conn.commit()
+
+    def log_stats(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        logger.info(f"vPIC cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,111 @@
+import csv
+import logging
+import os
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Accepted column names in an export, mapped to the store's columns
+COLUMN_ALIASES = {
+    'make': 'make', 'make_name': 'make', 'makename': 'make',
+    'model_id': 'model_id', 'modelid': 'model_id',
+    'model': 'model', 'model_name': 'model', 'modelname': 'model',
+    'year': 'year', 'model_year': 'year', 'modelyear': 'year',
+    'vehicle_type': 'vehicle_type', 'vehicle_type_name': 'vehicle_type', 'vehicletypename': 'vehicle_type',
+}
+COLUMNS = ('make', 'model_id', 'model', 'year', 'vehicle_type')
+
+
+class LocalVpicStore:
+    """Indexed SQLite copy of vPIC model data: one row per make, model, year and vehicle type.
+
+    Exports are flat tables (CSV, or a table in another SQLite file) with
+    make, model_id, model, year and vehicle_type columns; the usual vPIC
+    column names such as Make_Name or VehicleTypeName are accepted too.
+    """
+
+    def __init__(self, path="vpic_local.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS models (
+                make TEXT NOT NULL,
+                model_id INTEGER,
+                model TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                vehicle_type TEXT NOT NULL,
+                UNIQUE (make, model, year, vehicle_type)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS models_make_year ON models (make, year)")
+
+    def _insert(self, rows):
+        count = 0
+        with self.conn:
+            for row in rows:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO models (make, model_id, model, year, vehicle_type) VALUES (?, ?, ?, ?, ?)",
+                    (row['make'].strip().upper(), row.get('model_id') or None, row['model'].strip(),
+                     int(row['year']), row['vehicle_type'].strip().lower())
+                )
+                count += 1
+        return count
+
+    @staticmethod
+    def _normalise(header):
+        mapping = {}
+        for name in header:
+            key = COLUMN_ALIASES.get(name.strip().lower())
+            if key:
+                mapping[name] = key
+        missing = set(COLUMNS) - {'model_id'} - set(mapping.values())
+        if missing:
+            raise ValueError(f"Export is missing columns: {', '.join(sorted(missing))}")
+        return mapping
+
+    def ingest_csv(self, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            mapping = self._normalise(reader.fieldnames or [])
+            count = self._insert({mapping[k]: v for k, v in row.items() if k in mapping} for row in reader)
+        logger.info(f"Ingested {count} rows from {path}")
+        return count
+
+    def ingest_sqlite(self, path, table="models"):
+        source = sqlite3.connect(path)
+        try:
+            cursor = source.execute(f'SELECT * FROM "{table}"')
+            header = [column[0] for column in cursor.description]
+            mapping = self._normalise(header)
+            count = self._insert(
+                {mapping[k]: v for k, v in zip(header, row) if k in mapping} for row in cursor
+            )
+        finally:
+            source.close()
+        logger.info(f"Ingested {count} rows from {path}:{table}")
+        return count
+
+    def ingest(self, path, table="models"):
+        """Ingest a .csv file, or `table` of a SQLite database, by extension."""
+        if os.path.splitext(path)[1].lower() == '.csv':
+            return self.ingest_csv(path)
+        return self.ingest_sqlite(path, table)
+
+    def makes(self, vehicle_types):
+        types = [t.lower() for t in vehicle_types]
+        rows = self.conn.execute(
+            f"SELECT DISTINCT make FROM models WHERE vehicle_type IN ({','.join('?' * len(types))})", types
+        )
+        return [row[0] for row in rows]
+
+    def models(self, make, year, vehicle_types):
+        types = [t.lower() for t in vehicle_types]
+        rows = self.conn.execute(
+            f"SELECT DISTINCT model FROM models WHERE make = ? AND year = ? "
+            f"AND vehicle_type IN ({','.join('?' * len(types))})",
+            [make.upper(), int(year)] + types
+        )
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.conn.close()